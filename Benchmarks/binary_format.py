@@ -0,0 +1,114 @@
+"""
+Round-trips CompactGraphs through the binary format (asserting that
+nothing changes) and compares file size and save/load speed with
+the same graph stored as JSON (label table + child id lists).
+
+run with: python -m Benchmarks.binary_format
+"""
+import json
+import os
+import tempfile
+import time
+
+from Structure import CompactGraph
+from Structure.BinaryFormat import load, save
+from Structure.Blueprint import compile_blueprint
+
+from Benchmarks.blueprint import BLUEPRINT
+from Benchmarks.forest import book_words, synthetic_words
+
+
+def make_graph(words) -> CompactGraph:
+    program = compile_blueprint(BLUEPRINT)
+    graph = CompactGraph()
+    for word in words:
+        graph.add(program.convert(word))
+    return graph
+
+
+def check_round_trip(graph: CompactGraph, loaded: CompactGraph) -> None:
+    assert loaded.labels == graph.labels
+    assert loaded.label_ids == graph.label_ids
+    assert loaded.data == graph.data
+    assert loaded.child_offsets == graph.child_offsets
+    assert loaded.child_targets == graph.child_targets
+    assert loaded.parent_offsets == graph.parent_offsets
+    for i in range(len(graph)):
+        assert sorted(loaded.parents_of(i)) == sorted(graph.parents_of(i))
+    assert loaded.structure_of == graph.structure_of
+    assert loaded.starts == graph.starts
+    assert loaded.heads == graph.heads
+    assert loaded.tails == graph.tails
+
+
+def save_json(graph: CompactGraph, file: str) -> None:
+    with open(file, "w") as f:
+        json.dump({
+            "labels": graph.labels,
+            "nodes": [[graph.data[i], list(graph.children_of(i))] for i in range(len(graph))],
+            "structures": [[graph.starts[s + 1] - graph.starts[s], graph.heads[s], graph.tails[s]]
+                           for s in range(len(graph.heads))]
+        }, f)
+
+
+def load_json(file: str) -> CompactGraph:
+    with open(file) as f:
+        json_object = json.load(f)
+
+    graph = CompactGraph()
+    for label in json_object["labels"]:
+        graph.intern(label)
+
+    parents = [[] for _ in json_object["nodes"]]
+    for i, (label_id, children) in enumerate(json_object["nodes"]):
+        graph.data.append(label_id)
+        graph.child_targets.extend(children)
+        graph.child_offsets.append(len(graph.child_targets))
+        for child in children:
+            parents[child].append(i)
+    for node_parents in parents:
+        graph.parent_targets.extend(node_parents)
+        graph.parent_offsets.append(len(graph.parent_targets))
+
+    for structure, (size, head, tail) in enumerate(json_object["structures"]):
+        graph.starts.append(graph.starts[-1] + size)
+        graph.heads.append(head)
+        graph.tails.append(tail)
+        graph.structure_of.extend([structure] * size)
+    return graph
+
+
+def compare(name, words):
+    graph = make_graph(words)
+    print(f"{name}: {len(words)} words, {len(graph)} nodes")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for kind, save_func, load_func in (("binary", save, load),
+                                           ("json", save_json, load_json)):
+            file = os.path.join(directory, kind)
+
+            start = time.perf_counter()
+            save_func(graph, file)
+            saved = time.perf_counter()
+            loaded = load_func(file)
+            end = time.perf_counter()
+
+            check_round_trip(graph, loaded)
+            print(f"  {kind + ':':7} {os.path.getsize(file) / 2 ** 10:8.1f} KiB, "
+                  f"save {saved - start:5.2f} s, load {end - saved:5.2f} s")
+
+
+def main():
+    # edge cases
+    for words in ([], [""], ["a"]):
+        graph = make_graph(words)
+        with tempfile.TemporaryDirectory() as directory:
+            save(graph, os.path.join(directory, "graph"))
+            check_round_trip(graph, load(os.path.join(directory, "graph")))
+
+    compare("books", book_words())
+    compare("synthetic", synthetic_words(100_000))
+
+
+if __name__ == '__main__':
+    main()
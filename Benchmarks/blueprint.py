@@ -0,0 +1,77 @@
+"""
+Compares converting all words in the books with the compiled blueprint
+(one scan per word) against the per-pass approach, where the word is
+first made into a linear structure that is then searched once for
+every pattern in the blueprint.
+
+The per-pass numbers don't include doing the actual rewrites, so
+they are a lower bound for that approach. "reopened" converts the
+words again with a warm ConvertCache (like reopening a book).
+
+run with: python -m Benchmarks.blueprint
+"""
+import time
+
+from Structure import ConvertCache
+from Structure.Blueprint import QUIZ_BLUEPRINT, TempName, compile_blueprint
+from Structure.Constructor import convert_linear_word, find_all
+
+from Benchmarks.forest import book_words, synthetic_words
+
+BLUEPRINT = QUIZ_BLUEPRINT
+
+
+def patterns_of(blueprint):
+    for kind, arguments in blueprint:
+        for argument in arguments:
+            if kind == TempName.between_optional:
+                yield from argument
+            elif kind == TempName.replace:
+                yield argument[0]
+            else:
+                yield argument.removesuffix("$")
+
+
+def per_pass(words, blueprint):
+    patterns = list(patterns_of(blueprint))
+    for word in words:
+        struct = convert_linear_word(word)
+        for pattern in patterns:
+            find_all(pattern, struct)
+
+
+def compiled(words, blueprint):
+    program = compile_blueprint(blueprint)
+    for word in words:
+        program.convert(word)
+
+
+def reopened(words, blueprint):
+    cache = ConvertCache(max_size=len(words))
+    program = compile_blueprint(blueprint, cache)
+    for word in words:
+        program.convert(word)
+
+    # only the second time is timed
+    start = time.perf_counter()
+    program = compile_blueprint(blueprint, cache)
+    for word in words:
+        program.convert(word)
+    return time.perf_counter() - start
+
+
+def compare(name, words):
+    print(f"{name}: {len(words)} words")
+    for func in (per_pass, compiled, reopened):
+        start = time.perf_counter()
+        taken = func(words, BLUEPRINT) or time.perf_counter() - start
+        print(f"  {func.__name__ + ':':10} {taken:6.2f} s, {len(words) / taken:9.0f} words/s")
+
+
+def main():
+    compare("books", book_words())
+    compare("synthetic", synthetic_words(20_000))
+
+
+if __name__ == '__main__':
+    main()
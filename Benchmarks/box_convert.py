@@ -0,0 +1,43 @@
+"""
+Shows how box_convert() scales with the size of the structure
+(a list of n entries with alternatives and an optional part).
+
+run with: python -m Benchmarks.box_convert
+"""
+import time
+
+from Structure.Blueprint import compile_blueprint
+from Structure.DisplayStructure import box_convert
+
+from Benchmarks.blueprint import BLUEPRINT
+from Benchmarks.forest import book_words
+
+
+def main():
+    program = compile_blueprint(BLUEPRINT)
+
+    words = book_words()
+    failed = 0
+    start = time.perf_counter()
+    for word in words:
+        try:
+            box_convert(program.convert(word))
+        except (TypeError, ValueError, NotImplementedError):
+            # shapes that can't be drawn as boxes (yet)
+            failed += 1
+    print(f"books: {len(words)} words ({failed} can't be boxed), "
+          f"{time.perf_counter() - start:.2f} s")
+
+    for amount in (10, 100, 1_000, 3_000):
+        struct = program.convert(", ".join(f"w{i}/x{i}/ (y)" for i in range(amount)))
+        size = len(struct.get_all())
+
+        start = time.perf_counter()
+        box_convert(struct)
+        elapsed = time.perf_counter() - start
+
+        print(f"{amount:>5} entries, {size:>6} nodes: {elapsed:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Compares memory usage and throughput of normal Node structures
+with the same structures stored in a CompactGraph.
+
+run with: python -m Benchmarks.compact_graph
+"""
+import gc
+import random
+import time
+import tracemalloc
+
+from Structure import CompactGraph
+from Structure.Constructor import convert_linear_word
+
+WORD_AMOUNT = 100_000
+
+
+def synthetic_words(amount, seed=0):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyzáéíóúñ "
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 12)))
+            for _ in range(amount)]
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = build()
+    build_time = time.perf_counter() - start
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return out, build_time, memory
+
+
+def walk_nodes(structs):
+    """reads every word back by walking from head to tail"""
+    total = 0
+    for struct in structs:
+        node = struct.get_head()
+        while node.data != "tail":
+            node = next(iter(node.children))
+            total += 1
+    return total
+
+
+def walk_graph(graph):
+    total = 0
+    labels, data = graph.labels, graph.data
+    for head in graph.heads:
+        i = head
+        while labels[data[i]] != "tail":
+            i = graph.child_targets[graph.child_offsets[i]]
+            total += 1
+    return total
+
+
+def build_graph(words):
+    graph = CompactGraph()
+    for word in words:
+        graph.add(convert_linear_word(word))
+    return graph
+
+
+def report(name, build_time, memory, walk_time, amount):
+    print(f"{name:>12}: build {build_time:6.2f}s, "
+          f"memory {memory / 2 ** 20:7.1f} MiB "
+          f"({memory / amount:6.0f} B/word), "
+          f"walk {amount / walk_time:10.0f} words/s")
+
+
+def main():
+    words = synthetic_words(WORD_AMOUNT)
+
+    structs, build_time, memory = measure(
+        lambda: [convert_linear_word(word) for word in words])
+    start = time.perf_counter()
+    walk_nodes(structs)
+    report("Node", build_time, memory, time.perf_counter() - start, len(words))
+    del structs
+
+    graph, build_time, memory = measure(lambda: build_graph(words))
+    start = time.perf_counter()
+    walk_graph(graph)
+    report("CompactGraph", build_time, memory, time.perf_counter() - start, len(words))
+
+
+if __name__ == '__main__':
+    main()
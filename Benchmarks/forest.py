@@ -0,0 +1,67 @@
+"""
+Compares the amount of nodes (and memory) needed for all words in the
+books when every word is its own structure and when they are stored
+in a hash-consed Forest.
+
+run with: python -m Benchmarks.forest
+"""
+import glob
+import json
+import os
+import random
+import tracemalloc
+
+from Structure import Forest
+from Structure.Constructor import convert_linear_word
+
+BOOKS = os.path.join(os.path.dirname(__file__), "..", "Data", "DataFiles", "books")
+
+
+def book_words():
+    words = []
+    for file in glob.glob(os.path.join(BOOKS, "*", "*", "part_*.json")):
+        with open(file) as jsonFile:
+            for pair in json.load(jsonFile):
+                words += pair
+    return words
+
+
+def synthetic_words(amount, seed=0):
+    """spanish looking words with common articles and endings"""
+    rng = random.Random(seed)
+    articles = ["", "(el) ", "(la) ", "(los) ", "(las) "]
+    endings = ["ción", "mente", "dad", "o", "a", "ar", "er", "ir", "ando", "iendo"]
+    letters = "abcdefghijlmnoprstuvz"
+    return [rng.choice(articles) +
+            "".join(rng.choice(letters) for _ in range(rng.randint(2, 6))) +
+            rng.choice(endings)
+            for _ in range(amount)]
+
+
+def compare(name, words):
+    tracemalloc.start()
+    structs = [convert_linear_word(word) for word in words]
+    separate_memory = tracemalloc.get_traced_memory()[0]
+    separate_nodes = sum(len(struct.get_all()) for struct in structs)
+
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    forest = Forest()
+    for struct in structs:
+        forest.add(struct)
+    forest_memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"{name}: {len(words)} words")
+    print(f"  separate: {separate_nodes:9} nodes, {separate_memory / 2 ** 20:7.1f} MiB")
+    print(f"  forest:   {len(forest):9} nodes, {forest_memory / 2 ** 20:7.1f} MiB "
+          f"({separate_nodes / len(forest):.1f}x fewer nodes)")
+
+
+def main():
+    compare("books", book_words())
+    compare("synthetic", synthetic_words(50_000))
+
+
+if __name__ == '__main__':
+    main()
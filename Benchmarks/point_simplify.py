@@ -0,0 +1,46 @@
+"""
+Shows how Node.point_simplify() scales with the amount of
+alternative children (fan-out) a node has.
+
+run with: python -m Benchmarks.point_simplify
+"""
+import random
+import time
+
+from Structure import Node
+
+
+def fan_out_structure(fan_out, parent_amount=3, overlap=0.8, seed=0):
+    """
+    "parent_amount" parents that (mostly) all connect to
+    "fan_out" alternative children
+    """
+    rng = random.Random(seed)
+    parents = [Node(chr(ord("A") + i)) for i in range(parent_amount)]
+    children = [Node(chr(ord("a") + i % 26)) for i in range(fan_out)]
+
+    for parent in parents:
+        for child in children:
+            if rng.random() < overlap:
+                parent.add_connection(child)
+
+    parents[0].make_head_tail()
+    return parents[0]
+
+
+def main():
+    for budget in (1_000, 10_000, 100_000):
+        print(f"budget {budget}")
+        for fan_out in (2, 4, 8, 16, 32, 64, 128, 256):
+            struct = fan_out_structure(fan_out)
+
+            start = time.perf_counter()
+            struct.point_simplify(budget=budget)
+            elapsed = time.perf_counter() - start
+
+            points = sum(node.data == "point" for node in struct.get_all())
+            print(f"  fan-out {fan_out:4}: {elapsed * 1000:9.2f} ms, {points} points")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Batch renders the structures of all book words (headless) with the
+svg and png backends, once with empty layout caches and once more
+at another size (only the backend runs).
+
+run with: python -m Benchmarks.render
+"""
+import os
+import tempfile
+import time
+
+from Structure import render_files, render_svg
+from Structure.Blueprint import compile_blueprint
+from Structure.RasterRenderer import render_png
+
+from Benchmarks.blueprint import BLUEPRINT
+from Benchmarks.forest import book_words
+
+
+def main():
+    program = compile_blueprint(BLUEPRINT)
+    structures = {f"{i:05}": program.convert(word) for i, word in enumerate(book_words())}
+    print(f"{len(structures)} structures")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for kind, backend, extension in (("svg", render_svg, ".svg"),
+                                         ("png", render_png, ".png")):
+            for text_size in (40, 20):
+                start = time.perf_counter()
+                failed = render_files(structures, directory, backend, extension, text_size)
+                elapsed = time.perf_counter() - start
+
+                size = sum(os.path.getsize(os.path.join(directory, file))
+                           for file in os.listdir(directory) if file.endswith(extension))
+                print(f"  {kind} {text_size:>3} px: {elapsed:5.2f} s, "
+                      f"{size / 2 ** 20:5.1f} MiB, {len(failed)} failed")
+
+
+if __name__ == '__main__':
+    main()
@@ -300,6 +300,9 @@ class BookPart(ContainerPart):
 
     def make_structure(self):
         for path in get_im_dirs(self.file):
+            # hidden files/dirs (e.g. the structure cache) aren't parts
+            if os.path.basename(path).startswith('.'):
+                continue
             if not path.endswith('config.json'):
                 if path.endswith('.json'):
                     ContainerPart(self, path)
@@ -2,6 +2,7 @@ from Quiz.other.FadeText import Fade
 import tkinter as tk
 from Quiz.other.Words import WordData
 from Quiz.other import start_screen  # , end_screen
+from Structure import Matcher
 
 
 def translation_label_setup(root):
@@ -43,7 +44,10 @@ def rw_label_setup(root):
 
     def wrong_answer(handler):
         both(handler)
-        wrong_text_var.set(handler.current_word['translation'])
+        if handler.almost_right is not None:
+            wrong_text_var.set(f"Almost! {handler.almost_right}")
+        else:
+            wrong_text_var.set(handler.canonical_answer())
         wrong_text_fade.change(start=(255, 0, 0), end=(240, 240, 240), time=3)
 
     return right_answer, wrong_answer
@@ -74,8 +78,25 @@ def text_box_setup(root, word_data_handler):
         word_data_handler.check_correct(input_text.get())
         input_text.set("")
 
+    # live feedback while typing
+    status_colours = {"prefix": "black", "complete": "green", "diverged": "red"}
+    matcher = None
+    matcher_word = None
+
+    def live_check(*_):
+        nonlocal matcher, matcher_word
+        if word_data_handler.current_word is not matcher_word:
+            matcher_word = word_data_handler.current_word
+            matcher = Matcher(word_data_handler.current_automaton())
+
+        status = matcher.update(input_text.get())
+        input_field.config(fg=status_colours[status])
+
     input_field.bind('<Return>', check_word)
     input_field.bind('<KeyPress>', replace)
+    # runs after every change of the text (unlike <KeyPress> which
+    # runs before the typed char is added)
+    input_text.trace_add("write", live_check)
 
 
 # todo add a hinting system for words
@@ -1,9 +1,11 @@
+from functools import cached_property
 from typing import Literal
 
 import tkinter as tk
 import json
 
-from Structure import check_correct
+from Structure import CONVERT_CACHE, Automaton, compile_structure
+from Structure.BookCache import BookCache
 from Structure.Constructor import convert
 
 ModeType = Literal[
@@ -54,17 +56,29 @@ class Word:
             return self.lan_1_node
         return self.lan_2_node
 
+    @cached_property
+    def lan_1_automaton(self) -> Automaton:
+        return compile_structure(self.lan_1_node)
 
-def load_words(data_files):
-    book_data = []
-    for file in data_files:
-        with open(file) as jsonFile:
-            book_data += json.load(jsonFile)
-            jsonFile.close()
-    return book_data
+    @cached_property
+    def lan_2_automaton(self) -> Automaton:
+        return compile_structure(self.lan_2_node)
+
+    @property
+    def translation_automaton(self) -> Automaton:
+        if self.switch:
+            return self.lan_1_automaton
+        return self.lan_2_automaton
+
+    def check_correct(self, text) -> bool:
+        return self.translation_automaton.check(text)
 
 
-def convert_to_struct(config_file, words):
+def load_book(config_file, data_files) -> list[Word]:
+    """
+    converts all words in the book, the parts are read from the
+    book's cache if they haven't changed
+    """
     with open(config_file) as jsonFile:
         config = json.load(jsonFile)
         jsonFile.close()
@@ -72,15 +86,31 @@ def convert_to_struct(config_file, words):
     if config is None:
         raise TypeError("invalid config file")
 
+    book_cache = BookCache(config_file)
     structs = []
-    for word in words:
-        lan_1_node = convert(word[0], config)
-        lan_2_node = convert(word[1], config)
-        structs.append(Word(*word, lan_1_node, lan_2_node))
+    for file in data_files:
+        part = book_cache.load_part(file, lambda text: convert(text, config, CONVERT_CACHE))
+        for word, lan_1_node, lan_2_node in part:
+            structs.append(Word(*word, lan_1_node, lan_2_node))
+
+    share_automata(structs)
 
     return structs
 
 
+def share_automata(words: list[Word]) -> None:
+    """
+    compiles all words, words that accept exactly the same
+    answers get the same automaton
+    """
+    shared: dict[tuple, Automaton] = {}
+    for word in words:
+        word.lan_1_automaton = shared.setdefault(
+            word.lan_1_automaton.canonical_key(), word.lan_1_automaton)
+        word.lan_2_automaton = shared.setdefault(
+            word.lan_2_automaton.canonical_key(), word.lan_2_automaton)
+
+
 def get_words() -> list[Word]:
     # from Data.load_data import load_book_data
     from Data.FileBrowser import ask_for_files
@@ -92,8 +122,7 @@ def get_words() -> list[Word]:
         for book in books:
             config_file = book["config_file"]
             book_files = book["data_files"]
-            book_words = load_words(book_files)
-            words += convert_to_struct(config_file, book_words)
+            words += load_book(config_file, book_files)
 
         return words
 
@@ -216,7 +245,7 @@ class Words:
         self.on_new_word(self.current_word)
 
     def on_enter(self, text):
-        correct = check_correct(self.current_word.translation_text, text)
+        correct = self.current_word.check_correct(text)
 
         if correct:
             if self.on_correct is not None:
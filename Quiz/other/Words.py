@@ -1,3 +1,4 @@
+import json
 import random
 from typing import Literal
 
@@ -5,16 +6,31 @@ from typing import Literal
 from Quiz.other import end_screen
 
 
-from Structure import check_correct
+from Structure import CONVERT_CACHE, accepted_strings, compile_structure, edit_distance
 
+# answers at most this many typos away from a translation are "almost right"
+ALMOST_RIGHT_DISTANCE = 1
 
-def temp_func_3(_, data_files):
-    import json
+
+def temp_program(config: dict):
+    from Structure.Blueprint import compile_blueprint, config_blueprint
+
+    return compile_blueprint(config_blueprint(config), cache=CONVERT_CACHE)
+
+
+def temp_func_3(config_file, data_files):
+    from Structure.BookCache import BookCache
+
+    with open(config_file) as jsonFile:
+        config = json.load(jsonFile)
+
+    # the converted words are read from the book's cache if the
+    # parts (and config) haven't changed
+    program = temp_program(config)
+    book_cache = BookCache(config_file, program.key)
     book_data = []
     for file in data_files:
-        with open(file) as jsonFile:
-            book_data += json.load(jsonFile)
-            jsonFile.close()
+        book_data += book_cache.load_part(file, program.convert)
 
     # with open(config) as jsonFile:
     #     config_data = json.load(jsonFile)
@@ -31,24 +47,10 @@ def temp_func_3(_, data_files):
 
 # temporary implementation to use Structure module instead of the old Data module
 def temp_func_2(data: list) -> tuple[list[dict, ...], list[dict, ...]]:
-    from Structure.Constructor import convert_linear_word, TempName
-    from Structure.Helpers import OrStatement
-
     w1_to_w2 = []
     w2_to_w1 = []
 
-    blueprint = (
-        (TempName.between_greedy, (";",)),
-        (TempName.between_optional, (("(", ")"),)),
-        (TempName.between_permissive, ("/",)),
-        (TempName.replace, (("a, -n", OrStatement("a", "n")),
-                            ("o, -a, -as, -os", OrStatement("o", "a", "os", "as")),
-                            ("o, -a", OrStatement("o", "a")),)),
-        (TempName.optional, ("/ue/", "/ie/", "/de/", "... ", "de$")),
-        (TempName.between_permissive, (",",)),
-    )
-
-    for pair in data:
+    for pair, node_1, node_2 in data:
         # todo make simular word translations combine
         #  [hej, tjena] => [hola]
         #  [halå, tjena] => [oye]
@@ -56,8 +58,8 @@ def temp_func_2(data: list) -> tuple[list[dict, ...], list[dict, ...]]:
         #  [hej, tjena] => [hola, oye]
         #  [halå, tjena] => [hola, oye]
 
-        w1_to_w2.append({'word': pair[0], 'translation': convert_linear_word(pair[1], blueprint)})
-        w2_to_w1.append({'word': pair[1], 'translation': convert_linear_word(pair[0], blueprint)})
+        w1_to_w2.append({'word': pair[0], 'translation': node_2})
+        w2_to_w1.append({'word': pair[1], 'translation': node_1})
         # for word in pair[0]:
         #     w1_to_w2.append({'word': word, 'translation': pair[1]})
         #     # if word in w1_to_w2:
@@ -113,6 +115,7 @@ class WordData:
         self.wrong = []
 
         self.retry = False  # is true when you retry to type a word
+        self.almost_right = None  # the closest translation if the last answer was almost right
         self.current_word = {'word': None, 'translation': None}
 
     def setup(self, right_answer, wrong_answer, set_translate_text):
@@ -155,9 +158,19 @@ class WordData:
         self.right = []
         self.wrong = []
 
+    def current_automaton(self):
+        # the compiled translation is cached in the word
+        if 'automaton' not in self.current_word:
+            self.current_word['automaton'] = compile_structure(self.current_word['translation'])
+        return self.current_word['automaton']
+
+    def canonical_answer(self) -> str:
+        # the shortest correct translation
+        return next(accepted_strings(self.current_word['translation'], limit=1), "")
+
     def check_correct(self, word):
         # correct = word in self.current_word['translation']
-        correct = check_correct(word, self.current_word['translation'])
+        correct = self.current_automaton().check(word)
         if correct:
             # right
             if not self.retry:
@@ -170,6 +183,9 @@ class WordData:
 
         else:
             # wrong
+            nearest = edit_distance(self.current_word['translation'], word, ALMOST_RIGHT_DISTANCE)
+            self.almost_right = None if nearest is None else nearest[1]
+
             self.wrong_answer(self)
 
             if not self.retry:
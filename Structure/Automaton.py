@@ -0,0 +1,536 @@
+from __future__ import annotations
+
+from . import Node
+from .Snapshot import Snapshot, snapshot
+
+
+class Automaton:
+    """
+    Minimal DFA compiled from a structure.
+
+    transitions[state] maps a char to the next state, a missing
+    char means that the text can't be matched anymore. The start
+    state is always 0.
+    """
+
+    __slots__ = ("transitions", "accepting")
+
+    def __init__(self, transitions: list[dict[str, int]], accepting: list[bool]):
+        self.transitions = transitions
+        self.accepting = accepting
+
+    def __len__(self):
+        return len(self.transitions)
+
+    def state_transitions(self, state: int) -> dict[str, int]:
+        return self.transitions[state]
+
+    def canonical_key(self) -> tuple:
+        """
+        hashable form of the automaton, minimal automatons (i.e. compiled
+        ones) have the same key exactly when they accept the same texts
+        """
+        return (tuple(tuple(state_transitions.items()) for state_transitions in self.transitions),
+                tuple(self.accepting))
+
+    def check(self, text: str) -> bool:
+        transitions = self.transitions
+        state = 0
+        for char in text:
+            state = transitions[state].get(char)
+            if state is None:
+                return False
+        return self.accepting[state]
+
+
+class LazyAutomaton(Automaton):
+    """
+    Automaton whose transitions are computed the first time a state
+    is reached, used for combining automatons without building the
+    whole (possibly huge) product up front.
+
+    Every state has a key (e.g. the states of the combined automatons),
+    successors(key) returns {char: next key} and accepts(key) if
+    the state is accepting. transitions[state] is None until the
+    state has been reached.
+    """
+
+    __slots__ = ("state_keys", "state_ids", "successors", "accepts")
+
+    def __init__(self, start_key, successors, accepts):
+        super().__init__([None], [accepts(start_key)])
+        self.state_keys = [start_key]
+        self.state_ids = {start_key: 0}
+        self.successors = successors
+        self.accepts = accepts
+
+    def __len__(self):
+        self.reach_all()
+        return len(self.transitions)
+
+    def canonical_key(self) -> tuple:
+        """
+        the key of the expanded (minimal) automaton, so it's the same
+        as for a compiled automaton with the same texts
+        """
+        return self.expand().canonical_key()
+
+    def state_id(self, key) -> int:
+        state = self.state_ids.get(key)
+        if state is None:
+            state = self.state_ids[key] = len(self.state_keys)
+            self.state_keys.append(key)
+            self.transitions.append(None)
+            self.accepting.append(self.accepts(key))
+        return state
+
+    def state_transitions(self, state: int) -> dict[str, int]:
+        state_transitions = self.transitions[state]
+        if state_transitions is None:
+            state_transitions = self.transitions[state] = {
+                char: self.state_id(next_key)
+                for char, next_key in sorted(self.successors(self.state_keys[state]).items())}
+        return state_transitions
+
+    def check(self, text: str) -> bool:
+        transitions = self.transitions
+        state = 0
+        for char in text:
+            state_transitions = transitions[state]
+            if state_transitions is None:
+                state_transitions = self.state_transitions(state)
+            state = state_transitions.get(char)
+            if state is None:
+                return False
+        return self.accepting[state]
+
+    def reach_all(self) -> None:
+        """
+        computes the transitions of all states
+        """
+        state = 0
+        while state < len(self.state_keys):
+            self.state_transitions(state)
+            state += 1
+
+    def expand(self) -> Automaton:
+        """
+        computes all states, returns it as a normal (minimal) automaton
+        """
+        self.reach_all()
+        return minimize_dfa([dict(state_transitions) for state_transitions in self.transitions],
+                            list(self.accepting))
+
+
+def subset_construction(structure: Snapshot) -> tuple[list[dict[str, int]], list[bool]]:
+    """
+    converts the structure (as a NFA) to a DFA
+    """
+    start = structure.start
+    state_ids = {start: 0}
+    states = [start]
+    transitions = []
+    accepting = []
+
+    for state in states:
+        next_states: dict[str, set[int]] = {}
+        for node in state:
+            for char, successors in structure.closures[node].items():
+                next_states.setdefault(char, set()).update(successors)
+
+        state_transitions = {}
+        for char, next_state in next_states.items():
+            next_state = frozenset(next_state)
+            if next_state not in state_ids:
+                state_ids[next_state] = len(states)
+                states.append(next_state)
+            state_transitions[char] = state_ids[next_state]
+
+        transitions.append(state_transitions)
+        accepting.append(not structure.ends.isdisjoint(state))
+
+    return transitions, accepting
+
+
+def trim(transitions: list[dict[str, int]], accepting: list[bool]) -> None:
+    """
+    removes all transitions to states that can't lead to an accepting state
+    """
+    reverse: list[list[int]] = [[] for _ in transitions]
+    for state, state_transitions in enumerate(transitions):
+        for next_state in state_transitions.values():
+            reverse[next_state].append(state)
+
+    alive = [state for state, accept in enumerate(accepting) if accept]
+    is_alive = set(alive)
+    for state in alive:
+        for prev_state in reverse[state]:
+            if prev_state not in is_alive:
+                is_alive.add(prev_state)
+                alive.append(prev_state)
+
+    for state_transitions in transitions:
+        for char, next_state in list(state_transitions.items()):
+            if next_state not in is_alive:
+                del state_transitions[char]
+
+
+def hopcroft(transitions: list[dict[str, int]], accepting: list[bool]) -> list[int]:
+    """
+    Hopcroft's partition refinement, returns the block (group of
+    equivalent states) of every state.
+
+    Missing transitions go to an extra dead state.
+    """
+    dead = len(transitions)
+    alphabet = sorted({char for state_transitions in transitions for char in state_transitions})
+
+    # inverse[char][state] = all states that goes to state with char
+    inverse = {char: [[] for _ in range(dead + 1)] for char in alphabet}
+    for state, state_transitions in enumerate(transitions):
+        for char in alphabet:
+            inverse[char][state_transitions.get(char, dead)].append(state)
+    for char in alphabet:
+        inverse[char][dead].append(dead)
+
+    accepting_states = {state for state, accept in enumerate(accepting) if accept}
+    blocks = [block for block in (accepting_states, set(range(dead + 1)) - accepting_states)
+              if block]
+    block_of = [0] * (dead + 1)
+    for i, block in enumerate(blocks):
+        for state in block:
+            block_of[state] = i
+
+    waiting = set(range(len(blocks)))
+    while waiting:
+        splitter = list(blocks[waiting.pop()])
+
+        for char in alphabet:
+            # all states leading into the splitter, grouped by block
+            touched: dict[int, set[int]] = {}
+            for state in splitter:
+                for prev_state in inverse[char][state]:
+                    touched.setdefault(block_of[prev_state], set()).add(prev_state)
+
+            for i, inside in touched.items():
+                if len(inside) == len(blocks[i]):
+                    continue
+
+                outside = blocks[i] - inside
+                blocks[i] = inside
+                blocks.append(outside)
+                for state in outside:
+                    block_of[state] = len(blocks) - 1
+
+                if i in waiting or len(outside) <= len(inside):
+                    waiting.add(len(blocks) - 1)
+                else:
+                    waiting.add(i)
+
+    return block_of[:dead]
+
+
+def minimize_dfa(transitions: list[dict[str, int]], accepting: list[bool]) -> Automaton:
+    """
+    merges all equivalent states
+    """
+    trim(transitions, accepting)
+    return renumber(transitions, accepting, hopcroft(transitions, accepting))
+
+
+def renumber(transitions: list[dict[str, int]], accepting: list[bool],
+             blocks: list[int]) -> Automaton:
+    """
+    builds the automaton where every block is a state, the states
+    are numbered in the order they are reached from the start (trying
+    the chars in alphabetical order). For minimal automatons that
+    numbering only depends on the accepted texts.
+    """
+    state_ids = {blocks[0]: 0}
+    representatives = [0]
+    for state in representatives:
+        for _, next_state in sorted(transitions[state].items()):
+            if blocks[next_state] not in state_ids:
+                state_ids[blocks[next_state]] = len(representatives)
+                representatives.append(next_state)
+
+    return Automaton(
+        [{char: state_ids[blocks[next_state]]
+          for char, next_state in sorted(transitions[state].items())}
+         for state in representatives],
+        [accepting[state] for state in representatives]
+    )
+
+
+def compile_structure(struct_node: Node) -> Automaton:
+    """
+    compiles the structure to a minimal DFA
+
+    doesn't change the structure, the result is cached until it does
+    """
+    cache = struct_node.cache
+    out = cache.get("automaton")
+    if out is None:
+        out = cache["automaton"] = minimize_dfa(*subset_construction(snapshot(struct_node)))
+    return out
+
+
+def _common_prefix(a: str, b: str) -> int:
+    """
+    length of the common prefix, the comparisons are done in C
+    (typing usually only changes the end, then it's a single one)
+    """
+    if b.startswith(a):
+        return len(a)
+    if a.startswith(b):
+        return len(b)
+
+    low, high = 0, min(len(a), len(b)) - 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        if b.startswith(a[:mid]):
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+class Matcher:
+    """
+    Matches text against an automaton one char at a time, for
+    giving feedback while the text is being typed.
+
+    status is
+      "prefix" if the text so far can still become a correct answer
+      "complete" if the text is a correct answer
+      "diverged" if the text can't be matched anymore, diverged_at
+        is the index of the first char that couldn't be matched
+
+    feed() and backspace() are O(1), update() only rematches the
+    chars after the common prefix with the last text.
+    """
+
+    __slots__ = ("automaton", "chars", "states", "last_text")
+
+    def __init__(self, automaton: Automaton):
+        self.automaton = automaton
+        self.chars: list[str] = []
+        # states[i] is the state after matching chars[:i], it stops
+        # growing when the text diverges
+        self.states = [0]
+        # the text given to update(), None if it has been changed since
+        self.last_text: str | None = ""
+
+    @property
+    def text(self) -> str:
+        if self.last_text is None:
+            self.last_text = "".join(self.chars)
+        return self.last_text
+
+    @property
+    def diverged_at(self) -> int | None:
+        if len(self.states) <= len(self.chars):
+            return len(self.states) - 1
+        return None
+
+    @property
+    def status(self) -> str:
+        if self.diverged_at is not None:
+            return "diverged"
+        if self.automaton.accepting[self.states[-1]]:
+            return "complete"
+        return "prefix"
+
+    def _push(self, char: str) -> None:
+        if len(self.states) > len(self.chars):
+            state = self.automaton.state_transitions(self.states[-1]).get(char)
+            if state is not None:
+                self.states.append(state)
+        self.chars.append(char)
+
+    def _pop(self) -> None:
+        if len(self.states) > len(self.chars):
+            self.states.pop()
+        self.chars.pop()
+
+    def feed(self, char: str) -> str:
+        self._push(char)
+        self.last_text = None
+        return self.status
+
+    def backspace(self) -> str:
+        if self.chars:
+            self._pop()
+            self.last_text = None
+        return self.status
+
+    def update(self, text: str) -> str:
+        """
+        matches the new text, only the chars after the part that
+        didn't change are (re)matched
+        """
+        same = _common_prefix(self.text, text)
+
+        while len(self.chars) > same:
+            self._pop()
+        for char in text[same:]:
+            self._push(char)
+
+        self.last_text = text
+        return self.status
+
+
+def minimize(struct_node: Node) -> Node:
+    """
+    builds the smallest (deterministic) structure that accepts the same
+    texts as the structure, returns its head
+    """
+    automaton = compile_structure(struct_node)
+
+    # a node for every (state, char leading to it)
+    head = Node("head")
+    tail = Node("tail")
+    nodes: dict[tuple[int, str], Node] = {}
+
+    queue = [(0, head)]
+    for state, node in queue:
+        if automaton.accepting[state]:
+            node.add_connection(tail)
+        for char, next_state in automaton.transitions[state].items():
+            if (next_state, char) not in nodes:
+                nodes[next_state, char] = Node(char)
+                queue.append((next_state, nodes[next_state, char]))
+            node.add_connection(nodes[next_state, char])
+
+    return head
+
+
+def equivalent_automata(a: Automaton, b: Automaton) -> bool:
+    """
+    Hopcroft-Karp: merges the states of a and b that has to be
+    equivalent (union-find) and fails as soon as an accepting state
+    gets merged with a non accepting one. None is the dead state.
+    """
+    parents: dict[tuple[int, int | None], tuple[int, int | None]] = {}
+
+    def find(state):
+        while state in parents:
+            state = parents[state]
+        return state
+
+    def accepting(automaton, state):
+        return state is not None and automaton.accepting[state]
+
+    def chars(automaton, state):
+        return () if state is None else automaton.state_transitions(state).keys()
+
+    def step(automaton, state, char):
+        return None if state is None else automaton.state_transitions(state).get(char)
+
+    parents[(1, 0)] = (0, 0)
+    stack = [(0, 0)]
+    while stack:
+        a_state, b_state = stack.pop()
+        if accepting(a, a_state) != accepting(b, b_state):
+            return False
+
+        for char in chars(a, a_state) | chars(b, b_state):
+            a_next = step(a, a_state, char)
+            b_next = step(b, b_state, char)
+            a_root = find((0, a_next))
+            b_root = find((1, b_next))
+            if a_root != b_root:
+                parents[b_root] = a_root
+                stack.append((a_next, b_next))
+
+    return True
+
+
+def equivalent(a: Node, b: Node) -> bool:
+    """
+    if the structures accept exactly the same texts
+    """
+    return equivalent_automata(compile_structure(a), compile_structure(b))
+
+
+def product(automatons: tuple[Automaton, ...], accepts) -> LazyAutomaton:
+    """
+    Runs all automatons at the same time, the state is the tuple of
+    their states (None when one of them can't match anymore).
+    accepts(tuple of bools) decides if a combined state is accepting.
+    """
+    def successors(key):
+        chars = set()
+        for automaton, state in zip(automatons, key):
+            if state is not None:
+                chars |= automaton.state_transitions(state).keys()
+
+        out = {}
+        for char in chars:
+            next_key = tuple(
+                None if state is None else automaton.state_transitions(state).get(char)
+                for automaton, state in zip(automatons, key))
+            if any(state is not None for state in next_key):
+                out[char] = next_key
+        return out
+
+    def accepting(key):
+        return accepts(tuple(state is not None and automaton.accepting[state]
+                             for automaton, state in zip(automatons, key)))
+
+    return LazyAutomaton((0,) * len(automatons), successors, accepting)
+
+
+def union(*automatons: Automaton) -> LazyAutomaton:
+    """
+    accepts the texts that any of the automatons accepts
+    """
+    return product(automatons, any)
+
+
+def intersection(*automatons: Automaton) -> LazyAutomaton:
+    """
+    accepts the texts that all automatons accepts
+    """
+    return product(automatons, all)
+
+
+def difference(a: Automaton, b: Automaton) -> LazyAutomaton:
+    """
+    accepts the texts that a accepts but b doesn't
+    """
+    return product((a, b), lambda accepts: accepts[0] and not accepts[1])
+
+
+def concatenation(a: Automaton, b: Automaton) -> LazyAutomaton:
+    """
+    accepts a text from a followed by a text from b
+
+    the state is (state in a, all states b could be in)
+    """
+    def with_b_start(a_state, b_states):
+        if a_state is not None and a.accepting[a_state]:
+            return a_state, b_states | {0}
+        return a_state, b_states
+
+    def successors(key):
+        a_state, b_states = key
+        chars = set()
+        if a_state is not None:
+            chars |= a.state_transitions(a_state).keys()
+        for b_state in b_states:
+            chars |= b.state_transitions(b_state).keys()
+
+        out = {}
+        for char in chars:
+            a_next = None if a_state is None else a.state_transitions(a_state).get(char)
+            b_next = frozenset(b.state_transitions(b_state)[char] for b_state in b_states
+                               if char in b.state_transitions(b_state))
+            if a_next is not None or b_next:
+                out[char] = with_b_start(a_next, b_next)
+        return out
+
+    def accepting(key):
+        return any(b.accepting[b_state] for b_state in key[1])
+
+    return LazyAutomaton(with_b_start(0, frozenset()), successors, accepting)
@@ -1,5 +1,17 @@
 def connect(start: tuple[int, int], end: tuple[int, int], steps=100):
-    some_number = (start[0] + end[0]) // 2
+    points = control_points(start, end)
+    if len(points) == 2:
+        return points
+
+    return bezier(list(points), steps)
+
+
+def control_points(start: tuple[float, float], end: tuple[float, float]) -> tuple[tuple[float, float], ...]:
+    """
+    (start, end) if it's a straight line, otherwise the 4 points of
+    the bezier curve connect() draws
+    """
+    some_number = (start[0] + end[0]) / 2
     if end[0] < start[0]:
         print(f"{end} to {start} should have been another path")
         # return some kind of round path
@@ -7,12 +19,11 @@ def connect(start: tuple[int, int], end: tuple[int, int], steps=100):
     if start[1] == end[1]:
         return start, end
 
-    points = [
+    return (
         start,
         (some_number, start[1]),
         (some_number, end[1]),
-        end]
-    return bezier(points, steps)
+        end)
 
 
 def bezier(points: list[tuple[int, int]], steps: int) -> list[tuple[any, ...]]:
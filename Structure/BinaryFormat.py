@@ -0,0 +1,191 @@
+"""
+Binary file format for CompactGraphs:
+
+    magic "SGRF", version (1 byte)
+    varint: label count, node count, structure count
+    labels: varint byte length + utf-8 bytes
+    nodes (sequential ids): varint label id, varint child count,
+        per child varint zigzag(child id - node id)
+    structures: varint node count, varint head id + 1, varint tail id + 1
+        (0 if there isn't exactly one head/tail)
+
+Parents aren't stored, they are the reverse of the children.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+from array import array
+
+from .CompactGraph import CompactGraph
+
+MAGIC = b"SGRF"
+VERSION = 1
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buffer, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while buffer[pos] & 0x80:
+        value |= (buffer[pos] & 0x7F) << shift
+        shift += 7
+        pos += 1
+    return value | buffer[pos] << shift, pos + 1
+
+
+def _decode_varints(buffer) -> list[int]:
+    values = []
+    value = shift = 0
+    for byte in buffer:
+        if byte < 0x80:
+            values.append(value | byte << shift)
+            value = shift = 0
+        else:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+
+    if shift:
+        raise ValueError("truncated varint")
+    return values
+
+
+def to_bytes(graph: CompactGraph) -> bytes:
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+
+    _write_varint(out, len(graph.labels))
+    _write_varint(out, len(graph))
+    _write_varint(out, len(graph.heads))
+
+    for label in graph.labels:
+        encoded = label.encode()
+        _write_varint(out, len(encoded))
+        out += encoded
+
+    data = graph.data
+    offsets = graph.child_offsets
+    targets = graph.child_targets
+    for i in range(len(graph)):
+        _write_varint(out, data[i])
+        _write_varint(out, offsets[i + 1] - offsets[i])
+        for child in targets[offsets[i]:offsets[i + 1]]:
+            delta = child - i
+            _write_varint(out, delta << 1 if delta >= 0 else (-delta << 1) - 1)
+
+    for structure in range(len(graph.heads)):
+        _write_varint(out, graph.starts[structure + 1] - graph.starts[structure])
+        _write_varint(out, graph.heads[structure] + 1)
+        _write_varint(out, graph.tails[structure] + 1)
+
+    return bytes(out)
+
+
+def from_buffer(buffer) -> CompactGraph:
+    """
+    reads a graph from anything that supports slicing (bytes, mmap etc.)
+    """
+    try:
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise TypeError("not a structure file")
+        if buffer[len(MAGIC)] != VERSION:
+            raise TypeError(f"unsupported structure file version {buffer[len(MAGIC)]}")
+
+        return _read_graph(buffer, len(MAGIC) + 1)
+    except (IndexError, ValueError, OverflowError, UnicodeDecodeError) as error:
+        raise TypeError("corrupt structure file") from error
+
+
+def _read_graph(buffer, pos: int) -> CompactGraph:
+    label_count, pos = _read_varint(buffer, pos)
+    node_count, pos = _read_varint(buffer, pos)
+    structure_count, pos = _read_varint(buffer, pos)
+
+    labels = []
+    for _ in range(label_count):
+        size, pos = _read_varint(buffer, pos)
+        labels.append(bytes(buffer[pos:pos + size]).decode())
+        pos += size
+
+    # everything after the labels is varints
+    with memoryview(buffer) as view, view[pos:] as rest:
+        values = _decode_varints(rest)
+
+    graph = CompactGraph()
+    graph.labels = labels
+    graph.label_ids = {label: i for i, label in enumerate(labels)}
+
+    data = graph.data
+    child_offsets = graph.child_offsets
+    child_targets = graph.child_targets
+    parent_counts = [0] * (node_count + 1)
+    k = 0
+    for i in range(node_count):
+        if values[k] >= label_count:
+            raise ValueError(f"label id {values[k]} out of range")
+        data.append(values[k])
+        child_count = values[k + 1]
+        k += 2
+        if k + child_count > len(values):
+            raise ValueError("truncated children")
+        for delta in values[k:k + child_count]:
+            child = i + (delta >> 1 if not delta & 1 else -((delta + 1) >> 1))
+            if not 0 <= child < node_count:
+                raise ValueError(f"child id {child} out of range")
+            child_targets.append(child)
+            parent_counts[child + 1] += 1
+        k += child_count
+        child_offsets.append(len(child_targets))
+
+    # parents = reversed children (counting sort by child)
+    for i in range(node_count):
+        parent_counts[i + 1] += parent_counts[i]
+    graph.parent_offsets = array("I", parent_counts)
+    parent_targets = array("I", bytes(4 * len(child_targets)))
+    fill = parent_counts[:-1]
+    for i in range(node_count):
+        for child in child_targets[child_offsets[i]:child_offsets[i + 1]]:
+            parent_targets[fill[child]] = i
+            fill[child] += 1
+    graph.parent_targets = parent_targets
+
+    structure_of = graph.structure_of
+    for structure in range(structure_count):
+        size, head, tail = values[k:k + 3]
+        k += 3
+        start = graph.starts[-1]
+        if start + size > node_count or \
+                any(node and not start < node <= start + size for node in (head, tail)):
+            raise ValueError("invalid structure")
+        graph.starts.append(graph.starts[-1] + size)
+        graph.heads.append(head - 1)
+        graph.tails.append(tail - 1)
+        structure_of.extend([structure] * size)
+
+    if k != len(values):
+        raise ValueError("trailing data")
+    if graph.starts[-1] != node_count:
+        raise ValueError("nodes outside of the structures")
+
+    return graph
+
+
+def save(graph: CompactGraph, file: str) -> None:
+    with open(file, "wb") as f:
+        f.write(to_bytes(graph))
+
+
+def load(file: str) -> CompactGraph:
+    """
+    reads the file through mmap (the file is never copied as a whole)
+    """
+    with open(file, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            raise TypeError("not a structure file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return from_buffer(buffer)
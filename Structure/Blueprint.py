@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import re
+
+from . import Node
+from .CompactGraph import CompactNode
+from .ConvertCache import ConvertCache, config_key
+from .Helpers import OrStatement
+
+
+class TempName:
+    """
+    The kinds of rules a blueprint is made of. A blueprint is a
+    sequence of (kind, arguments).
+
+    between_greedy: (separator, ...)
+        the parts between the separators are alternative answers
+        "hej; tjena" => "hej" or "tjena"
+    between_optional: ((open, close), ...)
+        the text between open and close is optional
+        "(el) avión" => "el avión" or "avión"
+    between_permissive: (separator, ...)
+        the words on each side of the separator are alternatives
+        "det är/blir" => "det är" or "det blir"
+        (the word before has to be right next to the separator,
+        "grados /bajocero/" is kept as it is)
+    replace: ((pattern, OrStatement), ...)
+        the pattern is replaced by one of the options
+        "rojo, -a" (with ("o, -a", OrStatement("o", "a"))) => "rojo" or "roja"
+    optional: (pattern, ...)
+        the pattern is optional, a pattern ending with "$" only
+        matches at the end of the text
+    """
+
+    between_greedy = "between_greedy"
+    between_optional = "between_optional"
+    between_permissive = "between_permissive"
+    replace = "replace"
+    optional = "optional"
+
+
+# the rules the quiz converts the words with (see config_blueprint())
+QUIZ_BLUEPRINT = (
+    (TempName.between_greedy, (";",)),
+    (TempName.between_optional, (("(", ")"),)),
+    (TempName.between_permissive, ("/",)),
+    (TempName.replace, (("a, -n", OrStatement("a", "n")),
+                        ("o, -a, -as, -os", OrStatement("o", "a", "os", "as")),
+                        ("o, -a", OrStatement("o", "a")),)),
+    (TempName.optional, ("/ue/", "/ie/", "/de/", "... ", "de$")),
+    (TempName.between_permissive, (",",)),
+)
+
+# marks where a between_permissive separator was found
+_PERMISSIVE = ("permissive",)
+
+
+class CompiledBlueprint:
+    """
+    A blueprint compiled to a single tokenizer program.
+
+    All patterns of all rules are combined into one regex (longest
+    pattern first), so the text is scanned once and the structure
+    is built directly from the found tokens.
+
+    With a cache, convert() returns frozen structures shared with
+    earlier conversions of the same text (with the same blueprint).
+    """
+
+    def __init__(self, blueprint, cache: ConvertCache | None = None):
+        self.key = config_key(blueprint)
+        self.cache = cache
+
+        # pattern => token
+        tokens: dict[str, tuple] = {}
+        for kind, arguments in blueprint:
+            for argument in arguments:
+                if kind == TempName.between_greedy:
+                    tokens.setdefault(argument, ("greedy",))
+                elif kind == TempName.between_optional:
+                    open_str, close_str = argument
+                    tokens.setdefault(open_str, ("open", close_str))
+                    tokens.setdefault(close_str, ("close", close_str))
+                elif kind == TempName.between_permissive:
+                    tokens.setdefault(argument, _PERMISSIVE)
+                elif kind == TempName.replace:
+                    pattern, options = argument
+                    if isinstance(options, OrStatement):
+                        options = options.options
+                    tokens.setdefault(pattern, ("replace", tuple(options)))
+                elif kind == TempName.optional:
+                    tokens.setdefault(argument, ("optional", argument.removesuffix("$")))
+                else:
+                    raise TypeError(f"unknown blueprint rule {kind!r}")
+
+        patterns = sorted(tokens, key=lambda x: len(x.removesuffix("$")), reverse=True)
+        self.tokens: list[tuple] = [tokens[pattern] for pattern in patterns]
+        self.pattern = re.compile("|".join(
+            f"({re.escape(pattern[:-1])}$)" if pattern.endswith("$") and len(pattern) > 1
+            else f"({re.escape(pattern)})"
+            for pattern in patterns))
+
+    def parse(self, text: str) -> list[list[tuple[str, ...]]]:
+        """
+        converts the text to alternatives, every alternative is a list
+        of units and every unit is a tuple of the options for that part
+        """
+        alternatives = []
+        units: list[tuple[str, ...]] = []
+        optional_text = None
+        optional_close = None
+
+        position = 0
+        matches = self.pattern.finditer(text) if self.tokens else ()
+        for match in matches:
+            literal = text[position:match.start()]
+            position = match.end()
+            token = self.tokens[match.lastindex - 1]
+
+            if optional_text is not None:
+                # inside brackets everything is just text
+                if token[0] == "close" and token[1] == optional_close:
+                    units.append((optional_text + literal, ""))
+                    optional_text = None
+                else:
+                    optional_text += literal + match.group()
+                continue
+
+            units.extend((char,) for char in literal)
+
+            if token[0] == "greedy":
+                alternatives.append(units)
+                units = []
+            elif token[0] == "open":
+                optional_text = ""
+                optional_close = token[1]
+            elif token[0] == "close":
+                units.extend((char,) for char in match.group())
+            elif token is _PERMISSIVE:
+                units.append(_PERMISSIVE + (match.group(),))
+            elif token[0] == "replace":
+                units.append(token[1])
+            elif token[0] == "optional":
+                units.append((token[1], ""))
+
+        if optional_text is not None:
+            # unclosed bracket
+            units.append((optional_text + text[position:], ""))
+        else:
+            units.extend((char,) for char in text[position:])
+        alternatives.append(units)
+
+        return [_fix_spaces(_resolve_permissive(units)) for units in alternatives]
+
+    def convert(self, text: str) -> Node | CompactNode:
+        """
+        builds the structure for the text, returns the head
+        """
+        if self.cache is not None:
+            return self.cache.get(text, self.key, self.build)
+        return self.build(text)
+
+    def build(self, text: str) -> Node:
+        head = Node("head")
+        tail = Node("tail")
+
+        for units in self.parse(text):
+            frontier = {head}
+            for unit in units:
+                next_frontier = set()
+                for option in unit:
+                    ends = frontier
+                    for char in option:
+                        node = Node(char)
+                        for end in ends:
+                            end.add_connection(node)
+                        ends = {node}
+                    next_frontier |= ends
+                frontier = next_frontier
+
+            for end in frontier:
+                end.add_connection(tail)
+
+        return head
+
+
+def _is_char(unit) -> bool:
+    return len(unit) == 1 and unit[0] != " "
+
+
+def _word_start(units, i) -> int:
+    """
+    index of the first unit of the word ending at units[i]
+    """
+    while i >= 0 and _is_char(units[i]):
+        i -= 1
+    return i + 1
+
+
+def _resolve_permissive(units: list[tuple]) -> list[tuple[str, ...]]:
+    """
+    makes the words on each side of every permissive separator into
+    alternatives of each other
+    """
+    out = []
+    i = 0
+    while i < len(units):
+        unit = units[i]
+        i += 1
+        if unit[:1] != _PERMISSIVE:
+            out.append(unit)
+            continue
+
+        # the word right before (possibly already a list of alternatives)
+        if out and out[-1][:1] == _PERMISSIVE:
+            before_start = len(out) - 1
+            before = out[-1][1:]
+        else:
+            before_start = _word_start(out, len(out) - 1)
+            before = ("".join(part[0] for part in out[before_start:]),)
+
+        # the word after ("stor, stort")
+        after_start = i
+        while after_start < len(units) and units[after_start] == (" ",):
+            after_start += 1
+        after_end = after_start
+        while after_end < len(units) and _is_char(units[after_end]):
+            after_end += 1
+        after = "".join(part[0] for part in units[after_start:after_end])
+
+        if not before[0] or not after:
+            # nothing to be an alternative to, keep it as text
+            out.extend((char,) for char in unit[1])
+            continue
+
+        # keep it marked so that "a/b/c" becomes one unit
+        del out[before_start:]
+        out.append(_PERMISSIVE + before + (after,))
+        i = after_end
+
+    return [unit[1:] if unit[:1] == _PERMISSIVE else unit for unit in out]
+
+
+def _fix_spaces(units: list[tuple[str, ...]]) -> list[tuple[str, ...]]:
+    """
+    removes leading/trailing spaces and moves the space next to an
+    optional part into it, so leaving the part out doesn't leave
+    two spaces
+    """
+    while units and units[0] == (" ",):
+        units.pop(0)
+    while units and units[-1] == (" ",):
+        units.pop()
+
+    out = []
+    i = 0
+    while i < len(units):
+        unit = units[i]
+        if "" in unit and len(unit) > 1:
+            if i + 1 < len(units) and units[i + 1] == (" ",):
+                unit = tuple(option + " " if option else "" for option in unit)
+                i += 1
+            elif i + 1 == len(units) and out and out[-1] == (" ",):
+                out.pop()
+                unit = tuple(" " + option if option else "" for option in unit)
+            elif i + 1 < len(units) and out and out[-1] != (" ",) and \
+                    all(option.endswith(" ") for option in unit if option):
+                # "Hace... grados" => "Hace grados"
+                unit = tuple(option or " " for option in unit)
+        out.append(unit)
+        i += 1
+    return out
+
+
+def compile_blueprint(blueprint, cache: ConvertCache | None = None) -> CompiledBlueprint:
+    return CompiledBlueprint(blueprint, cache)
+
+
+def config_blueprint(config: dict) -> tuple:
+    """
+    QUIZ_BLUEPRINT with the rules from a book's config.json:
+        split_keys: the between_greedy separators
+        remove_between_keys: the between_optional pairs, pairs that
+            open and close with the same key (["/", "/"]) are left
+            out, "/" separates alternatives ("/ue/" etc. are optional
+            patterns in QUIZ_BLUEPRINT)
+        remove_keys: added to the optional patterns
+    missing keys keep the rules of QUIZ_BLUEPRINT
+    """
+    blueprint = []
+    for kind, arguments in QUIZ_BLUEPRINT:
+        if kind == TempName.between_greedy and "split_keys" in config:
+            arguments = tuple(config["split_keys"])
+        elif kind == TempName.between_optional and "remove_between_keys" in config:
+            arguments = tuple((open_str, close_str)
+                              for open_str, close_str in config["remove_between_keys"]
+                              if open_str != close_str)
+        elif kind == TempName.optional and "remove_keys" in config:
+            arguments += tuple(config["remove_keys"])
+        blueprint.append((kind, arguments))
+    return tuple(blueprint)
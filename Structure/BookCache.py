@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Callable
+
+from . import Node
+from .Automaton import Automaton, compile_structure
+from .BinaryFormat import from_buffer, to_bytes
+from .CompactGraph import CompactGraph, CompactNode
+
+# made next to the config.json of every book
+CACHE_DIR = ".structure_cache"
+
+# change when what's stored changes, so old cache files get rebuilt
+CACHE_VERSION = 2
+
+# a cache file is: the byte length of the json header (4 bytes, little
+# endian), the json header (version, key, pairs, ids and automatons) and
+# the graph (see BinaryFormat)
+HEADER_SIZE_BYTES = 4
+
+
+class BookCache:
+    """
+    On disk cache of the converted (and compiled) words of a book.
+
+    Every part file gets a cache file with all its structures frozen in
+    one CompactGraph (plus their automatons). The cache file stores the
+    hash of the part, the config.json and the converter key it was made
+    from, if any of them changes the part is converted again.
+
+    Nothing in a cache file is executed (no pickle), a file that
+    can't be read for any reason is just made again.
+    """
+
+    def __init__(self, config_file: str, key: str = ""):
+        """
+        "key" identifies the conversion (e.g. CompiledBlueprint.key)
+        """
+        self.book_dir = os.path.dirname(config_file)
+        self.directory = os.path.join(self.book_dir, CACHE_DIR)
+
+        with open(config_file, "rb") as file:
+            self.key = hashlib.sha1(file.read() + key.encode()).hexdigest()
+
+        # different conversions of the same book get different files
+        self.converter = hashlib.sha1(key.encode()).hexdigest()[:12]
+
+    def cache_file(self, part_file: str) -> str:
+        name = os.path.relpath(part_file, self.book_dir)
+        return os.path.join(self.directory,
+                            f"{hashlib.sha1(name.encode()).hexdigest()}-{self.converter}.cache")
+
+    def load_part(self, part_file: str,
+                  convert: Callable[[str], Node | CompactNode]
+                  ) -> list[tuple[list[str], CompactNode, CompactNode]]:
+        """
+        [(pair, lan_1 structure, lan_2 structure), ...] of the part,
+        read from the cache if it's up-to-date
+        """
+        with open(part_file, "rb") as file:
+            content = file.read()
+        key = hashlib.sha1(content).hexdigest() + self.key
+        cache_file = self.cache_file(part_file)
+
+        try:
+            with open(cache_file, "rb") as file:
+                version, cached_key, pairs, graph, ids, automatons = read_cache(file.read())
+        except Exception:
+            # missing, old, corrupt etc.
+            version = cached_key = None
+
+        if version != CACHE_VERSION or cached_key != key:
+            pairs = json.loads(content)
+            graph = CompactGraph()
+            ids = [graph.add(convert(text)).index for pair in pairs for text in pair]
+            automatons = [compile_structure(CompactNode(graph, i)) for i in ids]
+            self.save(cache_file, write_cache(key, pairs, graph, ids, automatons))
+
+        nodes = [CompactNode(graph, i) for i in ids]
+        for node, automaton in zip(nodes, automatons):
+            node.cache["automaton"] = automaton
+
+        return [(pair, nodes[2 * i], nodes[2 * i + 1]) for i, pair in enumerate(pairs)]
+
+    def save(self, cache_file: str, data: bytes) -> None:
+        # the cache is optional, not being able to write it is fine
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_file = cache_file + ".tmp"
+            with open(temp_file, "wb") as file:
+                file.write(data)
+            os.replace(temp_file, cache_file)
+        except OSError:
+            pass
+
+
+def encode_automaton(automaton: Automaton) -> list:
+    return [automaton.transitions, automaton.accepting]
+
+
+def decode_automaton(data) -> Automaton:
+    """
+    reverse of encode_automaton(), checks that it's a valid automaton
+    """
+    transitions, accepting = data
+    if not isinstance(transitions, list) or not isinstance(accepting, list) or \
+            not transitions or len(transitions) != len(accepting):
+        raise TypeError("invalid automaton")
+
+    for state_transitions in transitions:
+        if not isinstance(state_transitions, dict):
+            raise TypeError("invalid automaton")
+        for char, state in state_transitions.items():
+            if len(char) != 1 or type(state) is not int or not 0 <= state < len(transitions):
+                raise TypeError("invalid automaton")
+
+    if not all(isinstance(state_accepting, bool) for state_accepting in accepting):
+        raise TypeError("invalid automaton")
+
+    return Automaton(transitions, accepting)
+
+
+def write_cache(key: str, pairs: list, graph: CompactGraph,
+                ids: list[int], automatons: list[Automaton]) -> bytes:
+    header = json.dumps({
+        "version": CACHE_VERSION,
+        "key": key,
+        "pairs": pairs,
+        "ids": ids,
+        "automatons": [encode_automaton(automaton) for automaton in automatons]
+    }, ensure_ascii=False).encode()
+    return len(header).to_bytes(HEADER_SIZE_BYTES, "little") + header + to_bytes(graph)
+
+
+def read_cache(data: bytes) -> tuple[int, str, list, CompactGraph, list[int], list[Automaton]]:
+    """
+    reverse of write_cache(), raises TypeError if it isn't valid
+    """
+    header_size = int.from_bytes(data[:HEADER_SIZE_BYTES], "little")
+    header = json.loads(data[HEADER_SIZE_BYTES:HEADER_SIZE_BYTES + header_size])
+    graph = from_buffer(data[HEADER_SIZE_BYTES + header_size:])
+
+    ids = header["ids"]
+    automatons = [decode_automaton(automaton) for automaton in header["automatons"]]
+    if not all(type(i) is int and 0 <= i < len(graph) for i in ids) or \
+            len(automatons) != len(ids) or len(ids) != 2 * len(header["pairs"]):
+        raise TypeError("invalid cache file")
+
+    return header["version"], header["key"], header["pairs"], graph, ids, automatons
@@ -1,26 +1,24 @@
-from . import Node
-
+from typing import Iterable
 
-def get_direct_char_connections(node):
-    out = set()
-    for child in node.children:
-        if child.data == "point":
-            out |= get_direct_char_connections(child)
-        out.add(child)
-    return out
+from . import Node
+from .Snapshot import snapshot
+from .Automaton import compile_structure
 
 
-def check_correct(node: Node, text: str):
-    node.head_tail_simplify()
+def check_correct(node: Node, text: str) -> bool:
+    """
+    checks if "text" matches the structure
 
-    valid_nodes: set[Node] = {node.get_head()}
+    Doesn't change the structure, the matching is done on a
+    (cached) snapshot of it.
+    """
+    return snapshot(node).check(text)
 
-    for char in text:
-        valid_next_steps: set[Node] = set()
-        for valid_node in valid_nodes:
-            valid_next_steps |= set([child for child in get_direct_char_connections(valid_node)
-                                     if child.data == char])
-        valid_nodes = valid_next_steps
 
-    tail = node.get_tail()
-    return any([valid_end in tail for valid_end in valid_nodes])
+def check_correct_many(node: Node, answers: Iterable[str]) -> list[bool]:
+    """
+    checks all answers against the same structure, it's only
+    compiled once
+    """
+    check = compile_structure(node).check
+    return [check(text) for text in answers]
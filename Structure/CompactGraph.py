@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+from array import array
+
+from . import Node
+
+
+class CompactGraph:
+    """
+    Array backed storage for frozen structures.
+
+    Every node is an integer id, the data of a node is an index
+    into an interned label table and the connections are stored
+    CSR style, i.e. the children of node i are
+    child_targets[child_offsets[i]:child_offsets[i + 1]]
+    (same thing for the parents).
+
+    Any amount of structures can be stored in the same graph, each
+    added structure gets a contiguous range of ids. Structures
+    can't be changed once added, use CompactNode.to_node() to get
+    a normal (mutable) Node structure back.
+    """
+
+    def __init__(self):
+        self.labels: list[str] = []
+        self.label_ids: dict[str, int] = {}
+
+        self.data = array("I")
+        self.child_offsets = array("I", [0])
+        self.child_targets = array("I")
+        self.parent_offsets = array("I", [0])
+        self.parent_targets = array("I")
+
+        # per node: the index of the structure it belongs to
+        self.structure_of = array("I")
+
+        # per structure: the first id and the head/tail id (-1 if
+        # there isn't exactly one head/tail)
+        self.starts = array("I", [0])
+        self.heads = array("i")
+        self.tails = array("i")
+
+        # per structure: things computed from it (snapshots etc.)
+        self.caches: dict[int, dict] = {}
+
+    def __len__(self):
+        return len(self.data)
+
+    def intern(self, label: str) -> int:
+        label_id = self.label_ids.get(label)
+        if label_id is None:
+            label_id = len(self.labels)
+            self.labels.append(label)
+            self.label_ids[label] = label_id
+        return label_id
+
+    def add(self, struct_node: Node) -> CompactNode:
+        """
+        Freezes the structure that "struct_node" is part of and
+        returns the CompactNode corresponding to "struct_node".
+
+        Doesn't change the structure. Inner heads/tails (that
+        head_tail_simplify() would remove) are kept as they are.
+        """
+        nodes = list(struct_node.traverse())
+        base = len(self.data)
+        ids = {node: base + i for i, node in enumerate(nodes)}
+
+        structure_index = len(self.heads)
+        head = tail = -1
+        heads = tails = 0
+
+        for node in nodes:
+            self.data.append(self.intern(node.data))
+            self.structure_of.append(structure_index)
+
+            self.child_targets.extend(ids[child] for child in node.children)
+            self.child_offsets.append(len(self.child_targets))
+            self.parent_targets.extend(ids[parent] for parent in node.parents)
+            self.parent_offsets.append(len(self.parent_targets))
+
+            if node.data == "head" and not node.parents:
+                head = ids[node]
+                heads += 1
+            elif node.data == "tail" and not node.children:
+                tail = ids[node]
+                tails += 1
+
+        self.starts.append(len(self.data))
+        self.heads.append(head if heads == 1 else -1)
+        self.tails.append(tail if tails == 1 else -1)
+
+        return CompactNode(self, ids[struct_node])
+
+    # <editor-fold desc="id based access">
+    def label(self, i: int) -> str:
+        return self.labels[self.data[i]]
+
+    def children_of(self, i: int) -> array:
+        return self.child_targets[self.child_offsets[i]:self.child_offsets[i + 1]]
+
+    def parents_of(self, i: int) -> array:
+        return self.parent_targets[self.parent_offsets[i]:self.parent_offsets[i + 1]]
+
+    def structure_range(self, i: int) -> range:
+        structure_index = self.structure_of[i]
+        return range(self.starts[structure_index], self.starts[structure_index + 1])
+    # </editor-fold>
+
+
+def _read_only(name):
+    def method(self, *_args, **_kwargs):
+        raise TypeError(f"can't {name}() a frozen structure, "
+                        f"use to_node() to get a mutable copy")
+    method.__name__ = name
+    return method
+
+
+class CompactNode:
+    """
+    Node compatible (read only) facade over one node in a CompactGraph.
+    """
+
+    __slots__ = ("graph", "index")
+
+    def __init__(self, graph: CompactGraph, index: int):
+        self.graph = graph
+        self.index = index
+
+    def __repr__(self):
+        return self.data
+
+    def __eq__(self, other):
+        return isinstance(other, CompactNode) and \
+            self.index == other.index and self.graph is other.graph
+
+    def __hash__(self):
+        return hash((id(self.graph), self.index))
+
+    @property
+    def data(self) -> str:
+        return self.graph.label(self.index)
+
+    @property
+    def children(self) -> set[CompactNode]:
+        graph = self.graph
+        return {CompactNode(graph, i) for i in graph.children_of(self.index)}
+
+    @property
+    def parents(self) -> set[CompactNode]:
+        graph = self.graph
+        return {CompactNode(graph, i) for i in graph.parents_of(self.index)}
+
+    siblings = Node.siblings
+    super_siblings = Node.super_siblings
+    word_exclusive_child = Node.word_exclusive_child
+    weak_connections = Node.weak_connections
+
+    # <editor-fold desc="data retrieve">
+    def traverse(self):
+        graph = self.graph
+        for i in graph.structure_range(self.index):
+            yield CompactNode(graph, i)
+
+    def get_all(self) -> set[CompactNode]:
+        graph = self.graph
+        return {CompactNode(graph, i) for i in graph.structure_range(self.index)}
+
+    def get_head(self) -> CompactNode:
+        head = self.graph.heads[self.graph.structure_of[self.index]]
+        if head == -1:
+            raise TypeError("0 or multiple heads found")
+        return CompactNode(self.graph, head)
+
+    def get_tail(self) -> CompactNode:
+        tail = self.graph.tails[self.graph.structure_of[self.index]]
+        if tail == -1:
+            raise TypeError("0 or multiple tails found")
+        return CompactNode(self.graph, tail)
+    # </editor-fold>
+
+    @property
+    def cache(self) -> dict:
+        return self.graph.caches.setdefault(self.graph.structure_of[self.index], {})
+
+    def head_tail_simplify(self):
+        """
+        frozen structures can't be simplified, everything that reads
+        them skips the inner heads/tails anyway
+        """
+
+    def to_node(self) -> Node:
+        """
+        makes a normal Node copy of the structure and returns the
+        node corresponding to self
+        """
+        graph = self.graph
+        nodes = {i: Node(graph.label(i)) for i in graph.structure_range(self.index)}
+        for i, node in nodes.items():
+            for child in graph.children_of(i):
+                node.add_connection(nodes[child])
+        return nodes[self.index]
+
+    add_connection = _read_only("add_connection")
+    remove_connection = _read_only("remove_connection")
+    remove = _read_only("remove")
+    adopt = _read_only("adopt")
+    r_adopt = _read_only("r_adopt")
+    parallelize = _read_only("parallelize")
+    insert = _read_only("insert")
+    r_insert = _read_only("r_insert")
+    contract = _read_only("contract")
+    merge = _read_only("merge")
+    point_remove = _read_only("point_remove")
+    make_head_tail = _read_only("make_head_tail")
+    point_simplify = _read_only("point_simplify")
+    sync = _read_only("sync")
+
+
+def freeze(struct_node: Node, graph: CompactGraph | None = None) -> CompactNode:
+    """
+    shorthand for adding a single structure to a (new) CompactGraph
+    """
+    if graph is None:
+        graph = CompactGraph()
+    return graph.add(struct_node)
@@ -1,8 +1,18 @@
+from __future__ import annotations
+
 from . import Node
+from .CompactGraph import CompactNode
+from .ConvertCache import ConvertCache, config_key
 
 
-def convert(text: str, flags: list) -> Node:
-    return convert_linear_word(text)
+def convert(text: str, flags: list, cache: ConvertCache | None = None) -> Node | CompactNode:
+    """
+    if a cache is given the (frozen) structure is shared with all
+    earlier conversions of the same text with the same flags
+    """
+    if cache is None:
+        return convert_linear_word(text)
+    return cache.get(text, config_key(flags), convert_linear_word)
 
 
 def convert_linear_word(text: str) -> Node:
@@ -16,52 +26,272 @@ def convert_linear_word(text: str) -> Node:
 
 
 def or_convert(text: str) -> Node:
-    text.split("/")
+    """
+    "a/b/c" => structure that accepts "a", "b" or "c", returns the head
+    """
+    head = Node("head")
+    tail = Node("tail")
+    for option in text.split("/"):
+        cur = head
+        for char in option:
+            next_node = Node(char)
+            cur.add_connection(next_node)
+            cur = next_node
+        cur.add_connection(tail)
+    return head
+
+
+class Path:
+    """
+    A path found by find_all(), stored as a chain of parent pointers
+    (to the previous node) so paths that start the same share that part.
+    """
+
+    __slots__ = ("node", "previous", "length")
+
+    def __init__(self, node: Node, previous: Path | None = None):
+        self.node = node
+        self.previous = previous
+        self.length = 1 if previous is None else previous.length + 1
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return iter(self.nodes())
+
+    def __getitem__(self, index):
+        if index == -1:
+            return self.node
+        return self.nodes()[index]
 
-    return Node("")  # temporary
+    def __repr__(self):
+        return f"Path({self.nodes()})"
 
+    @property
+    def first(self) -> Node:
+        path = self
+        while path.previous is not None:
+            path = path.previous
+        return path.node
 
-def find_all(find_str: str, struct_node: Node) -> list[list[Node]]:
+    def nodes(self) -> list[Node]:
+        out = []
+        path = self
+        while path is not None:
+            out.append(path.node)
+            path = path.previous
+        out.reverse()
+        return out
+
+
+def label_index(struct_node: Node) -> dict[str, list[Node]]:
+    """
+    {data: [all nodes with that data], ...} (cached until the structure changes)
+    """
+    cache = struct_node.cache
+    index = cache.get("label_index")
+    if index is None:
+        index = cache["label_index"] = {}
+        for node in struct_node.traverse():
+            index.setdefault(node.data, []).append(node)
+    return index
+
+
+def find_all(find_str: str, struct_node: Node) -> list[Path]:
     """
     fins all "find_str" in struct_node
+
+    returns the paths [node before, first char node, ..., last char node],
+    only nodes with the first char (found in the label index) are
+    used as starting points.
     """
 
-    valid_options = [[node] for node in struct_node.get_all()]
-    next_opt = []
-    for char in find_str:
+    if not find_str:
+        return [Path(node) for node in struct_node.traverse()]
+
+    valid_options = [Path(first, Path(parent))
+                     for first in label_index(struct_node).get(find_str[0], ())
+                     for parent in first.parents]
+
+    for char in find_str[1:]:
+        next_opt = []
         for valid_option in valid_options:
-            for child in valid_option[-1].children:
+            for child in valid_option.node.children:
                 if child.data == char:
-                    next_opt.append(valid_option + [child])
+                    next_opt.append(Path(child, valid_option))
 
         valid_options = next_opt
 
     return valid_options
 
 
-def add_option(replace_str: str, with_str: str, struct_node: Node) -> None:
+def _follow(nodes: list[Node], copies_of: dict[Node, set[Node]]) -> list[Node] | None:
     """
-    Adds "with_str" at all "replace_str" in "struct_node".
+    the path nodes[0] => ... => nodes[-1] as it is now, i.e. going
+    through the copies that earlier cuts made, None if it's gone
     """
+    path = [nodes[0]]
+    for node in nodes[1:]:
+        # checked through .parents since remove() doesn't clear .children
+        for option in (node, *copies_of.get(node, ())):
+            if path[-1] in option.parents:
+                path.append(option)
+                break
+        else:
+            return None
+    return path
 
-    for valid_option in find_all(replace_str, struct_node):
-        repl = convert_linear_word(with_str)
-        repl.parents = valid_option[0].parents
-        repl.children = valid_option[-1].children
 
+def _topological(struct_node: Node) -> list[Node]:
+    """
+    all nodes, parents before children (nodes in loops last)
+    """
+    nodes = list(struct_node.traverse())
+    in_degree = {node: len(node.parents) for node in nodes}
+    order = [node for node in nodes if not in_degree[node]]
+    for node in order:
+        for child in node.children:
+            in_degree[child] -= 1
+            if not in_degree[child]:
+                order.append(child)
 
-def replace(replace_str: str, with_str: str, struct_node: Node) -> None:
+    if len(order) < len(nodes):
+        ordered = set(order)
+        order += [node for node in nodes if node not in ordered]
+    return order
+
+
+def _cut(nodes: list[Node]) -> list[tuple[Node, Node]]:
+    """
+    Removes the path nodes[0] => nodes[1] => ... => nodes[-1] without
+    removing any other path through the same nodes.
+
+    returns the [(node, copy of node), ...] that had to be made
+    """
+    before, match = nodes[0], nodes[1:]
+    before.remove_connection(match[0])
+
+    copies = []
+    if not (all(len(node.children) == 1 for node in match[:-1]) and
+            all(len(node.parents) == 1 for node in match[1:])):
+        # other paths go through the match, give "before" its own copy
+        # of it, with everything except the matched path
+        copies = [Node(node.data) for node in match[:-1]]
+        cur = before
+        for node, copy, next_node in zip(match, copies, match[1:]):
+            cur.add_connection(copy)
+            for child in node.children:
+                if child is not next_node:
+                    copy.add_connection(child)
+            cur = copy
+
+        for copy in reversed(copies):
+            if copy.children:
+                break
+            copy.remove()
+
+    # remove what can't be reached anymore
+    for node in match:
+        if node.parents:
+            break
+        node.remove()
+
+    return list(zip(match, copies))
+
+
+def rewrite(find_str: str, with_str: str, struct_node: Node, keep_match: bool = True) -> None:
+    """
+    Adds "with_str" as an alternative at every "find_str" in
+    "struct_node", if not "keep_match" the matches are removed.
+
+    All matches are found once, then handled in topological order so
+    that matches right after each other ("abab") are all rewritten.
+    Each rewrite only touches the nodes of that match (and their
+    neighbours), so it's linear in the size of the structure plus
+    the amount of matches.
+
+    Every occurrence on every path is a match, so for patterns that
+    can overlap themselves every way of picking matches that don't
+    overlap gives its own alternative:
+        keep_match: any set of them is rewritten
+        not keep_match: every maximal set (all matches overlap a
+            rewritten one), rewrite("aa", "x", "aaa") accepts "xa"
+            and "ax" where str.replace() only gives "xa"
+    For patterns that can't overlap themselves it's the same as
+    str.replace(). Text that goes through the "point" of an empty
+    replacement isn't matched.
     """
-    Replaces all "replace_str" with "with_str".
+    if not find_str:
+        raise TypeError("can't rewrite an empty string")
+
+    matches_from: dict[Node, list[list[Node]]] = {}
+    for path in find_all(find_str, struct_node):
+        nodes = path.nodes()
+        matches_from.setdefault(nodes[0], []).append(nodes)
+    if not matches_from:
+        return
+
+    # the nodes "with_str" ends at, for the matches ending at a node
+    replaced_at: dict[Node, set[Node]] = {}
+    cuts: list[tuple[set[Node], list[Node]]] = []
+    for before in _topological(struct_node):
+        # the text up to "before" can also end with a replacement
+        sources = {before} | replaced_at.get(before, set())
+
+        added = set()
+        for nodes in matches_from.get(before, ()):
+            cuts.append((sources, nodes))
+
+            last = nodes[-1]
+            if last in added:
+                continue
+            added.add(last)
+
+            # an empty replacement is a "point", connecting "before" to
+            # the children directly could merge it with another match
+            ends = sources
+            for char in with_str or ("point",):
+                next_node = Node(char)
+                for end in ends:
+                    end.add_connection(next_node)
+                ends = {next_node}
+            children = list(last.children)
+            for end in ends:
+                for child in children:
+                    end.add_connection(child)
+            replaced_at.setdefault(last, set()).update(ends)
+
+    if not keep_match:
+        # copies made by a cut continue into the later matches as well
+        copies_of: dict[Node, set[Node]] = {}
+        original: dict[Node, Node] = {}
+        for sources, nodes in cuts:
+            for source in {copy for source in sources
+                           for copy in (source, *copies_of.get(source, ()))}:
+                path = _follow([source] + nodes[1:], copies_of)
+                # might have been removed by an earlier (overlapping) cut
+                if path is not None:
+                    for node, copy in _cut(path):
+                        node = original.get(node, node)
+                        original[copy] = node
+                        copies_of.setdefault(node, set()).add(copy)
+
+
+def add_option(replace_str: str, with_str: str, struct_node: Node) -> None:
+    """
+    Adds "with_str" at all "replace_str" in "struct_node".
     """
+    rewrite(replace_str, with_str, struct_node)
 
-    add_option(replace_str, with_str, struct_node)
 
-    for valid_option in find_all(replace_str, struct_node):
-        for node in valid_option:
-            if len(node.children) == 1 and len(node.parents) == 1:
-                node.remove()
+def replace(replace_str: str, with_str: str, struct_node: Node) -> None:
+    """
+    Replaces all "replace_str" with "with_str" (see rewrite() for
+    patterns that overlap themselves).
+    """
+    rewrite(replace_str, with_str, struct_node, keep_match=False)
 
 
 def make_optional(replace_str: str, struct_node: Node) -> None:
-    replace(replace_str, "", struct_node)
+    add_option(replace_str, "", struct_node)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Callable
+
+from . import Node
+from .CompactGraph import CompactNode, freeze
+
+
+def config_key(config) -> str:
+    """
+    stable (between runs) hash of a config/blueprint
+    """
+    text = json.dumps(config, sort_keys=True, default=repr, ensure_ascii=False)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class ConvertCache:
+    """
+    LRU cache of converted texts, keyed by (text, config key).
+
+    The structures are frozen (CompactNode) so the same structure
+    can be handed out to everything that converts the same text,
+    use to_node() to get a mutable copy.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self.entries: OrderedDict[tuple[str, str], CompactNode] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return f"ConvertCache(size={len(self)}/{self.max_size}, " \
+               f"hits={self.hits}, misses={self.misses})"
+
+    def get(self, text: str, key: str, convert: Callable[[str], Node]) -> CompactNode:
+        """
+        the cached structure for "text", converted with "convert" and
+        frozen if it isn't cached
+        """
+        entry = (text, key)
+        struct = self.entries.get(entry)
+        if struct is not None:
+            self.hits += 1
+            self.entries.move_to_end(entry)
+            return struct
+
+        self.misses += 1
+        struct = self.entries[entry] = freeze(convert(text))
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return struct
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# converted words are shared between (re)opened and overlapping books,
+# by everything in the quiz
+CONVERT_CACHE = ConvertCache()
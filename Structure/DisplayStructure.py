@@ -1,90 +1,288 @@
-from . import Node, StructureType
+from functools import reduce
 
-from .Bezier import connect
+from . import Node, StructureType, CompactNode
 
-from PIL import Image, ImageFont, ImageDraw
 
+class SectionedList(list):
+    """
+    The layers of a structure (list of lists of nodes) together with
+    "section_of", the index of the layer every node is in.
 
-def get_sectioned_list(struct_node: Node):
-    def remove_from_layers(node):
-        for x in layers:
-            try:
-                x.remove(node)
-            except ValueError:
-                pass
-            else:
-                things.remove(node)
+    Also has a reachability index, every node gets a bit (in layer
+    order) and forward(node)/backward(node) are bitsets of all nodes
+    that eventually_connect()/eventually_connect_from() would find.
 
-    things = []
-    layers = []
-    queue = [struct_node.get_head()]
+    It also has the dominator and post dominator trees (over the edges
+    from one layer to a later one), used to find where boxes start and
+    end. The post dominator tree has a virtual exit (None) after all
+    nodes without children.
 
-    while len(queue) > 0:
-        next_queue = set()
-        layers.append(queue)
-        things += queue
+    The indexes are rebuilt if the structure has changed since.
+    """
+
+    def __init__(self, layers=(), section_of: dict[Node, int] | None = None,
+                 head: Node | None = None):
+        super().__init__(layers)
+        self.section_of: dict[Node, int] = {} if section_of is None else section_of
+        self.head = head
+
+        self.nodes: list[Node] = [node for part in self for node in part]
+        self.order: dict[Node, int] = {node: i for i, node in enumerate(self.nodes)}
+        # index in "nodes" of the first node of every layer
+        self.layer_starts: list[int] = [0]
+        for part in self:
+            self.layer_starts.append(self.layer_starts[-1] + len(part))
+
+        self.bit_of: dict[Node, int] = {}
+        self.layer_masks: list[int] = []
+        self.forward_masks: dict[Node, int] = {}
+        self.backward_masks: dict[Node, int] = {}
+        self._reachability_token = None
+
+        self.idom: list[int] = []
+        self.ipdom: list[int] = []
+        self._dominator_token = None
+
+    def _is_current(self, token) -> bool:
+        return token is not None and token in self.head.cache
+
+    def _new_token(self) -> object:
+        token = object()
+        self.head.cache[token] = True
+        return token
+
+    def _update_reachability(self) -> None:
+        if self._is_current(self._reachability_token):
+            return
+        self._reachability_token = self._new_token()
+
+        section_of = self.section_of
+        self.bit_of = {node: 1 << i for i, node in enumerate(self.nodes)}
+        self.layer_masks = []
+        start = 0
+        for part in self:
+            self.layer_masks.append((1 << start + len(part)) - (1 << start))
+            start += len(part)
+
+        # one pass from the back for forward, one from the front for backward
+        bit_of = self.bit_of
+        forward = self.forward_masks = {}
+        for node in reversed(self.nodes):
+            mask = 0
+            node_index = section_of[node]
+            for child in node.children:
+                if section_of.get(child, -1) >= node_index:
+                    mask |= bit_of[child] | forward.get(child, 0)
+            forward[node] = mask
+
+        backward = self.backward_masks = {}
+        for node in self.nodes:
+            mask = 0
+            node_index = section_of[node]
+            for parent in node.parents:
+                if section_of.get(parent, node_index) < node_index:
+                    mask |= bit_of[parent] | backward[parent]
+            backward[node] = mask
+
+    def _update_dominators(self) -> None:
+        """
+        Cooper, Harvey & Kennedy, the nodes are in topological
+        order so a single pass is enough. The nodes are numbered
+        by their index in "nodes" and len(nodes) is the exit.
+        """
+        if self._is_current(self._dominator_token):
+            return
+        self._dominator_token = self._new_token()
+
+        nodes = self.nodes
+        order = self.order
+        count = len(nodes)
+
+        idom = self.idom = [0] * count  # nodes[0] is the head
+        for i in range(1, count):
+            new = None
+            for parent in nodes[i].parents:
+                j = order.get(parent, i)
+                if j < i:
+                    new = j if new is None else self._intersect(new, j)
+            if new is not None:
+                idom[i] = new
+
+        ipdom = self.ipdom = [count] * (count + 1)
+        for i in range(count - 1, -1, -1):
+            # None until a child is found, count (the exit) is a valid result
+            new = None
+            for child in nodes[i].children:
+                j = order.get(child, -1)
+                if j > i:
+                    new = j if new is None else self._post_intersect(new, j)
+            if new is not None:
+                ipdom[i] = new
+
+    def _intersect(self, a: int, b: int) -> int:
+        idom = self.idom
+        while a != b:
+            while a > b:
+                a = idom[a]
+            while b > a:
+                b = idom[b]
+        return a
+
+    def _post_intersect(self, a: int, b: int) -> int:
+        ipdom = self.ipdom
+        while a != b:
+            while a < b:
+                a = ipdom[a]
+            while b < a:
+                b = ipdom[b]
+        return a
+
+    def bit(self, node: Node) -> int:
+        self._update_reachability()
+        return self.bit_of[node]
+
+    def forward(self, node: Node) -> int:
+        self._update_reachability()
+        return self.forward_masks[node]
+
+    def backward(self, node: Node) -> int:
+        self._update_reachability()
+        return self.backward_masks[node]
+
+    def dominator(self, nodes) -> Node:
+        """
+        the last node that all paths from the head to any of "nodes"
+        go through (can be one of "nodes")
+        """
+        self._update_dominators()
+        order = self.order
+        return self.nodes[reduce(self._intersect, [order[node] for node in nodes])]
+
+    def post_dominator(self, nodes) -> Node | None:
+        """
+        the first node that all paths from any of "nodes" go through
+        (can be one of "nodes"), None if there isn't one
+        """
+        self._update_dominators()
+        order = self.order
+        i = reduce(self._post_intersect, [order[node] for node in nodes])
+        return self.nodes[i] if i < len(self.nodes) else None
+
+    def immediate_dominator(self, node: Node) -> Node | None:
+        self._update_dominators()
+        i = self.order[node]
+        return self.nodes[self.idom[i]] if i else None
+
+    def immediate_post_dominator(self, node: Node) -> Node | None:
+        self._update_dominators()
+        i = self.ipdom[self.order[node]]
+        return self.nodes[i] if i < len(self.nodes) else None
+
+    def nodes_of(self, mask: int) -> set[Node]:
+        out = set()
+        while mask:
+            low = mask & -mask
+            out.add(self.nodes[low.bit_length() - 1])
+            mask ^= low
+        return out
+
+
+def get_sectioned_list(struct_node: Node) -> SectionedList:
+    """
+    Longest path layering from the head, i.e. every node is one layer
+    after its last parent. Self loops are ignored, other loops are cut
+    where a depth first search from the head finds them.
+    """
+    head = struct_node.get_head()
 
-        for thing in queue:
-            if things.count(thing) == 1:  # same as "< 2"
-                children = set(x for x in thing.children if x != thing)  # don't push self
-                next_queue |= set(children)
+    # depth first search for the reachable nodes and the back edges
+    state = {head: 1}  # 1 = on the stack, 2 = done
+    back_edges = set()
+    stack = [(head, iter(head.children))]
+    while stack:
+        node, children = stack[-1]
+        for child in children:
+            child_state = state.get(child)
+            if child_state is None:
+                state[child] = 1
+                stack.append((child, iter(child.children)))
+                break
+            if child_state == 1:
+                back_edges.add((node, child))
+        else:
+            state[node] = 2
+            stack.pop()
 
-                for child in children:
-                    remove_from_layers(child)
+    # Kahn's algorithm, a node is placed when all its parents are
+    in_degree = dict.fromkeys(state, 0)
+    for node in state:
+        for child in node.children:
+            if (node, child) not in back_edges:
+                in_degree[child] += 1
 
-        queue = list(next_queue)
+    section_of = {head: 0}
+    layers = []
+    queue = [head]
+    for node in queue:
+        # all parents are placed, so the section is final
+        section = section_of[node]
+        while section >= len(layers):
+            layers.append([])
+        layers[section].append(node)
+
+        for child in node.children:
+            if (node, child) in back_edges:
+                continue
+            section_of[child] = max(section_of.get(child, 0), section + 1)
+            in_degree[child] -= 1
+            if not in_degree[child]:
+                queue.append(child)
 
-    return layers
+    return SectionedList(layers, section_of, head)
 
 
-def get_section_index(node: Node, sectioned_list) -> int:
-    for i, part in enumerate(sectioned_list):
-        if node in part:
-            return i
+def get_section_index(node: Node, sectioned_list: SectionedList) -> int:
+    return sectioned_list.section_of.get(node)
 
 
 # <editor-fold desc="get specific node connections">
-def in_front(node: Node, sectioned_list) -> list[Node]:
-    out = []
+def in_front(node: Node, sectioned_list: SectionedList) -> list[Node]:
+    """
+    the nodes in the layer of node and all layers after it
+    """
     node_index = get_section_index(node, sectioned_list)
-    for part in sectioned_list[node_index:]:
-        out += part
-    return out
+    return sectioned_list.nodes[sectioned_list.layer_starts[node_index]:]
 
 
-def behind(node: Node, sectioned_list) -> list[Node]:
-    out = []
+def behind(node: Node, sectioned_list: SectionedList) -> list[Node]:
+    """
+    the nodes in all layers before the layer of node
+    """
     node_index = get_section_index(node, sectioned_list)
-    for part in sectioned_list[:node_index]:
-        out += part
-    return out
+    return sectioned_list.nodes[:sectioned_list.layer_starts[node_index]]
 
 
-def children_in_front(node: Node, sectioned_list) -> set[Node]:
-    return node.children & set(in_front(node, sectioned_list))
+def children_in_front(node: Node, sectioned_list: SectionedList) -> set[Node]:
+    section_of = sectioned_list.section_of
+    node_index = section_of.get(node, 0)
+    return {child for child in node.children if section_of.get(child, -1) >= node_index}
 
 
-def parents_behind(node: Node, sectioned_list) -> set[Node]:
-    return node.parents & set(behind(node, sectioned_list))
+def parents_behind(node: Node, sectioned_list: SectionedList) -> set[Node]:
+    section_of = sectioned_list.section_of
+    node_index = section_of.get(node, len(sectioned_list))
+    return {parent for parent in node.parents if section_of.get(parent, node_index) < node_index}
 
 
-def eventually_connect(node: Node, sectioned_list) -> set[Node]:
+def eventually_connect(node: Node, sectioned_list: SectionedList) -> set[Node]:
     """
     all nodes that current node eventually leeds to
     """
-    out = children_in_front(node, sectioned_list)
-    for child in out.copy():
-        out |= eventually_connect(child, sectioned_list)
-
-    return out
-
+    return sectioned_list.nodes_of(sectioned_list.forward(node))
 
-def eventually_connect_from(node: Node, sectioned_list) -> set[Node]:
-    out = parents_behind(node, sectioned_list)
-    for parent in out.copy():
-        out |= eventually_connect_from(parent, sectioned_list)
 
-    return out
+def eventually_connect_from(node: Node, sectioned_list: SectionedList) -> set[Node]:
+    return sectioned_list.nodes_of(sectioned_list.backward(node))
 # </editor-fold>
 
 
@@ -95,75 +293,49 @@ def get_box_end(children, sectioned_list) -> tuple[Node, bool]:
         If they lead exclusively to that node then it
         returns (Node, False) ("improper_bounding_box" is false).
         Otherwise, it returns (Node, True).
+
+    i.e. the closest common post dominator of the children
     """
     improper_bounding_box = False  # flag
-    shared_forward_nodes = set.intersection(*[
-        eventually_connect(child, sectioned_list) | {child}
-        for child in children
-    ])
-
-    # add all children in "f_ch" that are before the first "shared_backwards_nodes" to
-    # "nodes_to_iterate"
-    for part in sectioned_list:
-        # break when it finds the first "shared_backwards_nodes"
-        if any(x in shared_forward_nodes for x in part):
-            # get the last_node
-            last_node = shared_forward_nodes & set(part)
-
-            if len(last_node) > 1:
-                raise TypeError(f"there should be a point from "
-                                f"{[x.data for x in shared_forward_nodes]} to"
-                                f"{[x.data for x in last_node]}")
-
-            last_node = last_node.pop()
-
-            # check if it's an "improper_bounding_box"
-            if len(set.intersection(*[
-                children_in_front(parent, sectioned_list)
-                for parent in parents_behind(last_node, sectioned_list)
-            ])) > 1:
-                improper_bounding_box = True
-                continue
-                # continue until you actually find a "proper_box"
+    last_node = sectioned_list.post_dominator(children)
 
-            return last_node, improper_bounding_box
+    while last_node is not None:
+        # check if it's an "improper_bounding_box"
+        if len(set.intersection(*[
+            children_in_front(parent, sectioned_list)
+            for parent in parents_behind(last_node, sectioned_list)
+        ])) > 1:
+            improper_bounding_box = True
+            # continue until you actually find a "proper_box"
+            last_node = sectioned_list.immediate_post_dominator(last_node)
+            continue
+
+        return last_node, improper_bounding_box
 
 
 def get_box_start(parents, sectioned_list, find_proper_bounding_box=True) -> tuple[Node, bool]:
     """
     reverse of get_box_end()
+
+    i.e. the closest common dominator of the parents
     """
     improper_bounding_box = False  # flag
-    shared_backwards_nodes = set.intersection(*[
-        eventually_connect_from(parent, sectioned_list) | {parent} for parent in parents])
-
-    # add all children in "f_ch" that are before the first "shared_backwards_nodes" to
-    # "nodes_to_iterate"
-    for part in sectioned_list[::-1]:
-        # break when it finds the first "shared_backwards_nodes"
-        if any(x in shared_backwards_nodes for x in part):
-            # get the first_node
-            first_node = shared_backwards_nodes & set(part)
-
-            if len(first_node) > 1:
-                raise TypeError(f"there should be a point from "
-                                f"{[x.data for x in shared_backwards_nodes]} to"
-                                f"{[x.data for x in first_node]}")
-
-            first_node = first_node.pop()
-
-            # check if it's an "improper_bounding_box"
-            if len(set.intersection(*[
-                parents_behind(child, sectioned_list)
-                for child in children_in_front(first_node, sectioned_list)
-            ])) > 1:
-
-                improper_bounding_box = True
-                if find_proper_bounding_box:
-                    # continue until you actually find a "proper_box"
-                    continue
+    first_node = sectioned_list.dominator(parents)
+
+    while first_node is not None:
+        # check if it's an "improper_bounding_box"
+        if len(set.intersection(*[
+            parents_behind(child, sectioned_list)
+            for child in children_in_front(first_node, sectioned_list)
+        ])) > 1:
+
+            improper_bounding_box = True
+            if find_proper_bounding_box:
+                # continue until you actually find a "proper_box"
+                first_node = sectioned_list.immediate_dominator(first_node)
+                continue
 
-            return first_node, improper_bounding_box
+        return first_node, improper_bounding_box
 # </editor-fold>
 
 
@@ -178,9 +350,13 @@ def fix_box_edge_cases(struct_node: Node):
         start.
         """
 
-        def compute_part(current: set[Node], options: list[set[Node]]):
+        def compute_part(current: set[Node], options: list[set[Node]]) -> tuple[Node, list[set[Node]]]:
+            """
+            a node that leads to all of "current" (the node itself if
+            there's only one) and the options that are left
+            """
             if len(current) == 1:
-                return current
+                return next(iter(current)), []
 
             possible = []
             for option in options:
@@ -232,14 +408,17 @@ def fix_box_edge_cases(struct_node: Node):
             points_children = [box_start_children & eventually_connect_from(node, sectioned_list)
                                for node in same_box_start]
 
-            for rm_connection_node in box_start_children:
-                box_start_node.remove_connection(rm_connection_node)
+            biggest = max(points_children, key=lambda x: len(x))
+            if len(biggest) == 1:
+                # every box starts with a single node, nothing is hidden
+                continue
 
-            box_start_node.add_connection(compute_part(
-                max(points_children, key=lambda x: len(x)),
-                points_children)[0])
+            for rm_connection_node in biggest:
+                box_start_node.remove_connection(rm_connection_node)
 
-            next(iter(box_start_node.children)).contract()
+            some_point, _ = compute_part(biggest, points_children)
+            box_start_node.add_connection(some_point)
+            some_point.contract()
 
     def prevent_start_end_connection(node: Node) -> None:
         """
@@ -250,16 +429,24 @@ def fix_box_edge_cases(struct_node: Node):
 
         sectioned_list = get_sectioned_list(node)
 
+        # find all of them before changing anything, so the
+        # dominator trees are only computed once
+        start_end_connections = []
         for node in node.get_all():
             children_in_front_node = children_in_front(node, sectioned_list)
             if len(children_in_front_node) > 1:
                 box_end, _ = get_box_end(children_in_front_node, sectioned_list)
                 if box_end in children_in_front_node:
-                    node.remove_connection(box_end)
-                    some_point = Node("point")
-                    node.adopt(some_point)
-                    box_end.r_adopt(some_point)
+                    start_end_connections.append((node, box_end))
 
+        for node, box_end in start_end_connections:
+            node.remove_connection(box_end)
+            some_point = Node("point")
+            node.adopt(some_point)
+            box_end.r_adopt(some_point)
+
+    # points where several nodes join, e.g. after "(el)" in "(el) perro/gato"
+    struct_node.point_simplify()
     resolve_hidden_boxes(struct_node)
     prevent_start_end_connection(struct_node)
 
@@ -388,168 +575,13 @@ def box_convert(struct_node: Node) -> StructureType:
 
         return nodes_connected_to_last.pop(), struct_part
 
+    if isinstance(struct_node, CompactNode):
+        # fix_box_edge_cases() changes the structure
+        struct_node = struct_node.to_node()
+
     fix_box_edge_cases(struct_node)
     sectioned_list = get_sectioned_list(struct_node)
     tail = struct_node.get_tail()
     head = struct_node.get_head()
 
     return iterate_to(head, tail)[1] + [tail]
-
-
-def structure_image(struct_node: Node, text_size=100):
-    def get_width(image):
-        return image.size[0]
-
-    def get_height(image):
-        return image.size[1]
-
-    def compute_part(part_struct) -> Image:
-
-        def should_draw_line(j):
-            if isinstance(part_struct[j], tuple):
-                return False
-
-            if j < len(part_struct) - 1:
-
-                if isinstance(part_struct[j], Node) and \
-                        isinstance(part_struct[j + 1], Node):
-                    return False
-
-                if isinstance(part_struct[j + 1], tuple):
-                    return False
-
-            return True
-
-        if isinstance(part_struct, Node):
-            if len(part_struct.data) > 1:
-                text = ""
-            else:
-                text = part_struct.data
-
-            _, _, width, height = font.getbbox(text)
-
-            # make space for the line
-            if height == 0:
-                height = 1
-
-            sub_image = Image.new("RGBA", (width, height))
-            draw = ImageDraw.Draw(sub_image)
-            draw.rectangle((0, 0) + sub_image.size, fill=(255, 100, 255))
-            draw.text((0, 0), text, fill=(0, 0, 0), font=font)
-
-            return sub_image
-
-        if isinstance(part_struct, list):
-            ignored_first_connection = False
-            total_width = 0
-            max_height = 0
-            image_parts = []
-
-            for i, part in enumerate(part_struct):
-                img_part = compute_part(part)
-                image_parts.append(img_part)
-
-                total_width += get_width(img_part)
-
-                if should_draw_line(i) and ignored_first_connection:
-                    total_width += x_margin
-                ignored_first_connection = True
-
-                max_height = max(max_height, get_height(img_part))
-
-            sub_image = Image.new("RGBA", (total_width, max_height))
-            draw = ImageDraw.Draw(sub_image)
-            # draw.rectangle((0, 0) + sub_image.size, fill=(100, 0, 0))
-
-            # add all image_parts
-            cur_tot_width = 0
-            for i, part in enumerate(image_parts):
-                pos = (cur_tot_width, (max_height - get_height(part)) // 2)
-
-                sub_image.paste(part, pos)
-
-                cur_tot_width += get_width(part)
-
-                if should_draw_line(i):
-                    cur_tot_width += x_margin
-
-            # connect image_parts
-            mid_pos = max_height // 2
-            cur_tot_width = 0
-            for i, part in enumerate(image_parts):
-                cur_tot_width += get_width(part)
-
-                if i == 0:
-                    continue
-
-                if should_draw_line(i):
-                    cur_tot_width += x_margin
-                    draw.line(((cur_tot_width, mid_pos), (cur_tot_width + x_margin, mid_pos)))
-
-            return sub_image
-
-        if isinstance(part_struct, tuple):
-            total_height = 0
-            max_width = 0
-            image_parts = []
-
-            for part in part_struct:
-                img_part = compute_part(part)
-                image_parts.append(img_part)
-
-                total_height += get_height(img_part)
-                max_width = max(max_width, get_width(img_part))
-
-            total_height += y_margin * (len(image_parts) - 1)
-            max_width += x_margin * 2
-
-            sub_image = Image.new("RGBA", (max_width, total_height))
-            draw = ImageDraw.Draw(sub_image)
-            # draw.rectangle((0, 0) + sub_image.size, fill=(0, 0, 0))
-
-            # add all image_parts
-            cur_tot_height = 0
-            start_pos = 0, total_height // 2
-            end_pos = max_width, total_height // 2
-            for part in image_parts:
-                x_pos = (max_width - get_width(part)) // 2
-                y_mid_pos = cur_tot_height + get_height(part) // 2
-
-                # draw image_part
-                sub_image.paste(part, (x_pos, cur_tot_height))
-
-                # connect image_part
-                draw.line(connect(
-                    start_pos,
-                    (x_margin, y_mid_pos)
-                ))
-
-                draw.line(connect(
-                    (max_width - x_margin, y_mid_pos),
-                    end_pos
-                ))
-
-                # line connect
-                draw.line((
-                    (x_margin, y_mid_pos),
-                    (x_pos, y_mid_pos)
-                ))
-
-                draw.line((
-                    (x_pos + part.width, y_mid_pos),
-                    (max_width - x_margin, y_mid_pos)
-                ))
-
-                cur_tot_height += get_height(part) + y_margin
-
-            return sub_image
-
-    structure = box_convert(struct_node)
-
-    font = ImageFont.truetype('arial.ttf', text_size)
-    _, _, x_margin, text_height = font.getbbox("ooo")
-    y_margin = text_height // 4
-    x_margin = x_margin // 2
-
-    img = compute_part(structure)
-    img.show()
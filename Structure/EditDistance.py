@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from . import Node
+from .Snapshot import snapshot
+
+
+def edit_distance(struct_node: Node, text: str, max_distance: int) -> tuple[int, str] | None:
+    """
+    The smallest edit (Levenshtein) distance between "text" and any
+    text the structure accepts, together with that accepted text.
+    Returns None if the distance is larger than "max_distance".
+
+    Runs directly over the structure (as a NFA), the states are
+    (amount of chars of "text" used, node) which are visited in order
+    of distance, so only states within "max_distance" are ever visited.
+    """
+    structure = snapshot(struct_node)
+    if structure.check(text):
+        return 0, text
+
+    closures = structure.closures
+    nodes = structure.nodes
+    ends = structure.ends
+
+    best: dict[tuple[int, int], int] = {}
+    # state => (previous state, the accepted char it added)
+    came_from: dict[tuple[int, int], tuple[tuple[int, int] | None, str]] = {}
+    buckets: list[list[tuple[int, int]]] = [[] for _ in range(max_distance + 1)]
+
+    def push(state, distance, previous, char):
+        if distance <= max_distance and distance < best.get(state, max_distance + 1):
+            best[state] = distance
+            came_from[state] = (previous, char)
+            buckets[distance].append(state)
+
+    for node in structure.start:
+        push((0, node), 0, None, "")
+
+    for distance, bucket in enumerate(buckets):
+        # the bucket can grow while iterating it (0 cost matches)
+        for state in bucket:
+            if best[state] != distance:
+                continue
+
+            i, node = state
+            if i == len(text) and node in ends:
+                chars = []
+                while state is not None:
+                    state, char = came_from[state]
+                    chars.append(char)
+                return distance, "".join(reversed(chars))
+
+            if i < len(text):
+                # extra char in text
+                push((i + 1, node), distance + 1, state, "")
+
+            for char, successors in closures[node].items():
+                for successor in successors:
+                    if i < len(text):
+                        # same or substituted char
+                        push((i + 1, successor),
+                             distance + (char != text[i]), state, nodes[successor].data)
+                    # missing char in text
+                    push((i, successor), distance + 1, state, nodes[successor].data)
+
+    return None
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from array import array
+
+from . import Node
+
+
+class Forest:
+    """
+    Book level storage of many structures where every structurally
+    identical part is only stored once (hash-consing).
+
+    A node is identified by its data and its children, nodes are
+    added children first so identical sub-structures always end up
+    as the same id. The result is a minimised DAWG (all shared
+    endings are merged) with one entry point (head) per structure.
+
+    Beginnings can't be shared this way since the children of a
+    shared node would be reachable from all entry points.
+    """
+
+    def __init__(self):
+        self.labels: list[str] = []
+        self.label_ids: dict[str, int] = {}
+
+        self.data = array("I")
+        self.child_offsets = array("I", [0])
+        self.child_targets = array("I")
+
+        # (label id, child ids) => node id
+        self.signatures: dict[tuple[int, tuple[int, ...]], int] = {}
+
+        # the head id of every added structure
+        self.entries = array("I")
+
+    def __len__(self):
+        return len(self.data)
+
+    def intern(self, label: str) -> int:
+        label_id = self.label_ids.get(label)
+        if label_id is None:
+            label_id = len(self.labels)
+            self.labels.append(label)
+            self.label_ids[label] = label_id
+        return label_id
+
+    def node_id(self, label: str, children: tuple[int, ...]) -> int:
+        """
+        the id of the node with that data and those children,
+        the node is added if it doesn't exist yet
+        """
+        signature = (self.intern(label), children)
+        node_id = self.signatures.get(signature)
+        if node_id is None:
+            node_id = self.signatures[signature] = len(self.data)
+            self.data.append(signature[0])
+            self.child_targets.extend(children)
+            self.child_offsets.append(len(self.child_targets))
+        return node_id
+
+    def add(self, struct_node: Node) -> int:
+        """
+        adds the structure that "struct_node" is part of, returns
+        the index of its entry
+        """
+        nodes = list(struct_node.traverse())
+
+        # children first (Kahn's algorithm on the reversed structure)
+        children_left = {node: len(node.children) for node in nodes}
+        queue = [node for node in nodes if not node.children]
+        ids = {}
+        for node in queue:
+            ids[node] = self.node_id(node.data, tuple(sorted(ids[child] for child in node.children)))
+            for parent in node.parents:
+                children_left[parent] -= 1
+                if children_left[parent] == 0:
+                    queue.append(parent)
+
+        if len(ids) != len(nodes):
+            raise TypeError("can't add a structure with loops to a forest")
+
+        heads = [node for node in nodes if node.data == "head" and not node.parents]
+        if len(heads) != 1:
+            raise TypeError(f"{len(heads)} heads found")
+
+        self.entries.append(ids[heads[0]])
+        return len(self.entries) - 1
+
+    def children_of(self, i: int) -> array:
+        return self.child_targets[self.child_offsets[i]:self.child_offsets[i + 1]]
+
+    def structure(self, entry: int) -> Node:
+        """
+        a normal Node copy of the structure, returns its head
+        """
+        head = self.entries[entry]
+        nodes = {head: Node(self.labels[self.data[head]])}
+        queue = [head]
+        for i in queue:
+            for child in self.children_of(i):
+                if child not in nodes:
+                    nodes[child] = Node(self.labels[self.data[child]])
+                    queue.append(child)
+                nodes[i].add_connection(nodes[child])
+        return nodes[head]
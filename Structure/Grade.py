@@ -0,0 +1,114 @@
+"""
+Re-grades logged answers, e.g. after a book's config.json changed.
+
+The log is a JSONL file with one [word, typed] pair per line, where
+"word" is the correct answer as written in the book. The result is
+written as JSONL [word, typed, correct] lines in the same order.
+
+usage: python -m Structure.Grade log.jsonl --config book/config.json
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .Blueprint import CompiledBlueprint, compile_blueprint, config_blueprint
+from .CheckCorrect import check_correct_many
+from .ConvertCache import config_key
+
+# config key => the compiled config_blueprint() (per process)
+_programs: dict[str, CompiledBlueprint] = {}
+
+
+def load_log(file) -> list[tuple[str, str]]:
+    attempts = []
+    for line in file:
+        if line.strip():
+            word, typed = json.loads(line)
+            attempts.append((word, typed))
+    return attempts
+
+
+def group_attempts(attempts: list[tuple[str, str]]) -> dict[str, list[int]]:
+    """
+    {word: [index of attempt, ...], ...}
+    """
+    groups: dict[str, list[int]] = {}
+    for i, (word, _) in enumerate(attempts):
+        groups.setdefault(word, []).append(i)
+    return groups
+
+
+def get_program(config) -> CompiledBlueprint:
+    """
+    the same rules the quiz uses for a book with this config
+    """
+    key = config_key(config)
+    program = _programs.get(key)
+    if program is None:
+        program = _programs[key] = compile_blueprint(config_blueprint(config))
+    return program
+
+
+def grade_word(word: str, answers: list[str], config) -> list[bool]:
+    return check_correct_many(get_program(config).convert(word), answers)
+
+
+def grade(attempts: list[tuple[str, str]], config, jobs: int = 1) -> list[bool]:
+    """
+    grades all attempts, every word is only converted and compiled
+    once, "jobs" > 1 spreads the words over that many processes
+    """
+    groups = group_attempts(attempts)
+    words = list(groups)
+    answers = [[attempts[i][1] for i in groups[word]] for word in words]
+
+    if jobs > 1:
+        with ProcessPoolExecutor(jobs) as executor:
+            results = list(executor.map(
+                grade_word, words, answers, [config] * len(words),
+                chunksize=max(1, len(words) // (jobs * 4))))
+    else:
+        results = [grade_word(word, word_answers, config)
+                   for word, word_answers in zip(words, answers)]
+
+    out = [False] * len(attempts)
+    for word, word_results in zip(words, results):
+        for i, correct in zip(groups[word], word_results):
+            out[i] = correct
+    return out
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="re-grade logged answers")
+    parser.add_argument("log", help="JSONL file with [word, typed] pairs")
+    parser.add_argument("--config", required=True, help="the book's config.json")
+    parser.add_argument("--output", help="where to write the result (default stdout)")
+    parser.add_argument("--jobs", type=int, default=1, help="amount of processes")
+    args = parser.parse_args(args)
+
+    with open(args.config) as jsonFile:
+        config = json.load(jsonFile)
+    with open(args.log) as log_file:
+        attempts = load_log(log_file)
+
+    start = time.perf_counter()
+    results = grade(attempts, config, args.jobs)
+    elapsed = time.perf_counter() - start
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for (word, typed), correct in zip(attempts, results):
+            output.write(json.dumps([word, typed, correct]) + "\n")
+    finally:
+        if args.output:
+            output.close()
+
+    print(f"graded {len(attempts)} attempts ({sum(results)} correct) "
+          f"in {elapsed:.2f}s, {len(attempts) / max(elapsed, 1e-9):.0f} attempts/s",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
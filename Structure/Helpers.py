@@ -0,0 +1,10 @@
+class OrStatement:
+    """
+    Alternatives in a blueprint, any of the options is accepted.
+    """
+
+    def __init__(self, *options: str):
+        self.options: tuple[str, ...] = options
+
+    def __repr__(self):
+        return f"OrStatement{self.options}"
@@ -1,42 +1,127 @@
+from __future__ import annotations
+
 import json
+from heapq import heapify, heappop, heappush
 
 from . import Node
 
-import uuid
 
+def _colors(nodes: set[Node], colors: dict[Node, int] = None) -> dict[Node, int]:
+    """
+    Colour refinement: starts with the data (or the given colours) and
+    then repeatedly splits nodes with the same colour by the colours of
+    their children and parents, until nothing changes.
 
-def covert_to_json(struct_node: Node) -> str:
-    node_to_id = {}
-    for node in struct_node.get_all():
-        node_to_id[node] = uuid.uuid4()
+    The colours are ranks of sorted signatures, so they only depend
+    on the shape of the structure.
+    """
+    if colors is None:
+        labels = sorted({node.data for node in nodes})
+        rank = {label: i for i, label in enumerate(labels)}
+        colors = {node: rank[node.data] for node in nodes}
 
-    def convert_object_reference(temp: set[Node]):
-        return set(*[node_to_id[thing] for thing in temp])
+    color_count = len(set(colors.values()))
+    while True:
+        signatures = {node: (colors[node],
+                             tuple(sorted(colors[child] for child in node.children)),
+                             tuple(sorted(colors[parent] for parent in node.parents)))
+                      for node in nodes}
+        rank = {signature: i for i, signature in enumerate(sorted(set(signatures.values())))}
+        colors = {node: rank[signature] for node, signature in signatures.items()}
 
-    json_object = {}
-    for node in struct_node.get_all():
-        json_object[node_to_id[node]] = {
-            "data": node.data,
-            "parents": convert_object_reference(node.parents),
-            "children": convert_object_reference(node.children)}
+        if len(rank) == color_count:
+            return colors
+        color_count = len(rank)
 
-    return json.dumps(json_object)
 
+def sorted_nodes(struct_node: Node) -> list[Node]:
+    """
+    All nodes in the structure in a deterministic topological order
+    (nodes in loops last).
 
-def covert_to_struct(json_str: str) -> Node:
-    json_object: dict = json.loads(json_str)
+    Nodes that are ready at the same time are ordered by their colour
+    (see _colors) and then by the positions of their parents, so the
+    order only depends on the shape of the structure.
+    When several nodes still tie, the first one is individualized,
+    otherwise e.g. the pairs in "ab/ab" could be matched up differently.
+    """
+    nodes = struct_node.get_all()
+    colors = _colors(nodes)
+
+    in_degree = {node: len(node.parents) for node in nodes}
+    ready = []
+    for node in nodes:
+        if not in_degree[node]:
+            heappush(ready, (colors[node], (), id(node), node))
+
+    out = []
+    position = {}
+    while ready:
+        color, parents, _, node = heappop(ready)
+        if ready and ready[0][:2] == (color, parents):
+            colors = _individualize(nodes, colors, node)
+            ready = [(colors[other], other_parents, id(other), other)
+                     for _, other_parents, _, other in ready]
+            heapify(ready)
+        position[node] = len(out)
+        out.append(node)
+        for child in node.children:
+            in_degree[child] -= 1
+            if not in_degree[child]:
+                parents = tuple(sorted(position[parent] for parent in child.parents))
+                heappush(ready, (colors[child], parents, id(child), child))
+
+    if len(out) < len(nodes):
+        left = nodes - set(out)
+        while left:
+            node = min(left, key=lambda x: (colors[x], id(x)))
+            if sum(colors[other] == colors[node] for other in left) > 1:
+                colors = _individualize(nodes, colors, node)
+            left.remove(node)
+            out.append(node)
+    return out
+
+
+def _individualize(nodes: set[Node], colors: dict[Node, int], node: Node) -> dict[Node, int]:
+    """
+    gives the node its own colour and refines again, so nodes tied with
+    it are split by how they relate to it
+    """
+    return _colors(nodes, {other: 2 * color + (other is node) for other, color in colors.items()})
 
-    id_to_node = {}
-    for node_id in json_object.keys():
-        id_to_node[node_id] = Node("")
 
-    def convert_id_reference(temp: set[Node]):
-        return set(*[id_to_node[thing] for thing in temp])
+def covert_to_json(struct_node: Node) -> str:
+    """
+    Deterministic json for the structure, one node per line:
+    [{"data": ..., "parents": [ids], "children": [ids]}, ...]
+    where the id is the index in the list.
+
+    Structures with the same shape give exactly the same json.
+    """
+    nodes = sorted_nodes(struct_node)
+    node_to_id = {node: i for i, node in enumerate(nodes)}
+
+    lines = [json.dumps({
+        "data": node.data,
+        "parents": sorted(node_to_id[parent] for parent in node.parents),
+        "children": sorted(node_to_id[child] for child in node.children)},
+        ensure_ascii=False)
+        for node in nodes]
+
+    return "[\n" + ",\n".join(lines) + "\n]\n"
+
+
+def covert_to_struct(json_str: str) -> Node:
+    """
+    returns the first node (the head if the structure has one)
+    """
+    json_object: list = json.loads(json_str)
+    if not json_object:
+        raise TypeError("empty structure")
 
-    for node_id, data in json_object:
-        node = id_to_node[node_id]
-        node.data = data["data"]
-        node.parents = convert_id_reference(data["parents"])
-        node.children = convert_id_reference(data["children"])
+    nodes = [Node(node_data["data"]) for node_data in json_object]
+    for node, node_data in zip(nodes, json_object):
+        for child in node_data["children"]:
+            node.add_connection(nodes[child])
 
-    return next(iter(id_to_node.items()))
+    return nodes[0]
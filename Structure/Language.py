@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from heapq import heappop, heappush
+from typing import Iterator
+
+from . import Node
+from .Automaton import Automaton, compile_structure
+
+
+def shortest_remaining(automaton: Automaton) -> list[int | None]:
+    """
+    the length of the shortest text that leads from every state to an
+    accepting state (None if there isn't any)
+    """
+    reverse: list[list[int]] = [[] for _ in automaton.transitions]
+    for state, state_transitions in enumerate(automaton.transitions):
+        for next_state in state_transitions.values():
+            reverse[next_state].append(state)
+
+    remaining: list[int | None] = [0 if accept else None for accept in automaton.accepting]
+    queue = [state for state, accept in enumerate(automaton.accepting) if accept]
+    for state in queue:
+        for prev_state in reverse[state]:
+            if remaining[prev_state] is None:
+                remaining[prev_state] = remaining[state] + 1
+                queue.append(prev_state)
+    return remaining
+
+
+def accepted_strings(struct_node: Node, limit: int | None = None) -> Iterator[str]:
+    """
+    Lazily yields the texts the structure accepts, shortest first
+    (and alphabetically for the same length).
+
+    Every step is guided by the shortest remaining length of the
+    states, so getting the first few texts is about as fast as
+    reading them, no matter how much the structure branches.
+    """
+    automaton = compile_structure(struct_node)
+    remaining = shortest_remaining(automaton)
+    if remaining[0] is None:
+        return
+
+    # (shortest possible total length, text so far, is not finished, state)
+    heap: list[tuple[int, str, bool, int]] = [(remaining[0], "", True, 0)]
+    found = 0
+    while heap and (limit is None or found < limit):
+        length, text, expand, state = heappop(heap)
+
+        if not expand:
+            found += 1
+            yield text
+            continue
+
+        if automaton.accepting[state]:
+            heappush(heap, (len(text), text, False, state))
+
+        for char, next_state in automaton.transitions[state].items():
+            if remaining[next_state] is not None:
+                heappush(heap, (len(text) + 1 + remaining[next_state],
+                                text + char, True, next_state))
+
+
+def count_accepted(struct_node: Node) -> int:
+    """
+    the amount of different texts the structure accepts, counted
+    without expanding them
+    """
+    automaton = compile_structure(struct_node)
+    transitions = automaton.transitions
+
+    counts: list[int | None] = [None] * len(transitions)
+    # iterative post order, states on the stack are being counted
+    on_stack = [False] * len(transitions)
+    stack = [(0, iter(transitions[0].values()))]
+    on_stack[0] = True
+
+    while stack:
+        state, next_states = stack[-1]
+        for next_state in next_states:
+            if on_stack[next_state]:
+                raise TypeError("the structure accepts infinitely many texts")
+            if counts[next_state] is None:
+                on_stack[next_state] = True
+                stack.append((next_state, iter(transitions[next_state].values())))
+                break
+        else:
+            stack.pop()
+            on_stack[state] = False
+            counts[state] = int(automaton.accepting[state]) + sum(
+                counts[next_state] for next_state in transitions[state].values())
+
+    return counts[0]
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Callable, TypeVar
+
+from . import Node, StructureType, CompactNode
+from .Bezier import control_points
+from .DisplayStructure import box_convert
+from .JsonConverter import covert_to_json, covert_to_struct
+
+T = TypeVar("T")
+
+# all sizes are in em (multiples of the text size), the backends scale them
+CHAR_WIDTH = 0.6
+TEXT_HEIGHT = 1.0
+X_MARGIN = 0.8  # room for the lines in and out of a box
+Y_MARGIN = 0.2  # between the options of a box
+
+# used by all backends
+CHAR_BACKGROUND = (255, 100, 255)
+TEXT_COLOR = (0, 0, 0)
+LINE_COLOR = (0, 0, 0)
+
+# the layouts of the last structures, by structure hash
+CACHE_SIZE = 1_000
+_layouts: OrderedDict[str, LayoutBox] = OrderedDict()
+
+
+class LayoutBox:
+    """
+    One part of a layout, either a char (text isn't None) or a row/column
+    of other boxes.
+
+    "children" are (x, y, box) with the position relative to this box
+    and "segments" are the lines between them, 2 points for a straight
+    line and 4 for a bezier curve (see Bezier.control_points()).
+
+    Layouts are cached and shared, so they shouldn't be changed.
+    """
+
+    __slots__ = ("width", "height", "text", "children", "segments")
+
+    def __init__(self, width: float = 0, height: float = 0, text: str | None = None):
+        self.width = width
+        self.height = height
+        self.text = text
+        self.children: list[tuple[float, float, LayoutBox]] = []
+        self.segments: list[tuple[tuple[float, float], ...]] = []
+
+    def __repr__(self):
+        if self.text is not None:
+            return f"LayoutBox({self.text!r})"
+        return f"LayoutBox({self.width:g}x{self.height:g}, {len(self.children)} parts)"
+
+
+def _has_line(left, right) -> bool:
+    """
+    if there should be a line between two parts of a row, boxes
+    (tuples) have their own lines and chars are written next to
+    each other
+    """
+    if isinstance(left, tuple) or isinstance(right, tuple):
+        return False
+
+    return not (isinstance(left, Node) and isinstance(right, Node))
+
+
+def _char_box(node: Node) -> LayoutBox:
+    # heads, tails and points aren't written
+    text = node.data if len(node.data) == 1 else ""
+    return LayoutBox(CHAR_WIDTH * len(text), TEXT_HEIGHT if text else 0, text)
+
+
+def _row_box(parts: list) -> LayoutBox:
+    boxes = [_layout_part(part) for part in parts]
+
+    row = LayoutBox(height=max(box.height for box in boxes))
+    mid = row.height / 2
+    x = 0
+    for i, box in enumerate(boxes):
+        if i and _has_line(parts[i - 1], parts[i]):
+            row.segments.append(((x, mid), (x + X_MARGIN, mid)))
+            x += X_MARGIN
+
+        row.children.append((x, (row.height - box.height) / 2, box))
+        x += box.width
+
+    row.width = x
+    return row
+
+
+def _column_box(options: tuple) -> LayoutBox:
+    boxes = [_layout_part(option) for option in options]
+
+    column = LayoutBox(max(box.width for box in boxes) + X_MARGIN * 2,
+                       sum(box.height for box in boxes) + Y_MARGIN * (len(boxes) - 1))
+    start = 0, column.height / 2
+    end = column.width, column.height / 2
+    y = 0
+    for box in boxes:
+        x = (column.width - box.width) / 2
+        mid = y + box.height / 2
+        column.children.append((x, y, box))
+
+        column.segments.append(control_points(start, (X_MARGIN, mid)))
+        column.segments.append(control_points((column.width - X_MARGIN, mid), end))
+        if x > X_MARGIN:
+            column.segments.append(((X_MARGIN, mid), (x, mid)))
+            column.segments.append(((x + box.width, mid), (column.width - X_MARGIN, mid)))
+
+        y += box.height + Y_MARGIN
+
+    return column
+
+
+def _layout_part(part_struct: StructureType | Node) -> LayoutBox:
+    if isinstance(part_struct, list):
+        return _row_box(part_struct)
+
+    if isinstance(part_struct, tuple):
+        return _column_box(part_struct)
+
+    return _char_box(part_struct)
+
+
+def layout(struct_node: Node | CompactNode) -> LayoutBox:
+    """
+    The layout of the structure (the boxes from box_convert()).
+
+    Cached in the structure and by structure hash, so drawing the
+    same structure again (at another size or with another backend)
+    doesn't compute anything again. Doesn't change the structure.
+    """
+    cache = struct_node.cache
+    box = cache.get("layout")
+    if box is not None:
+        return box
+
+    json_str = covert_to_json(struct_node)
+    key = hashlib.sha1(json_str.encode()).hexdigest()
+
+    box = _layouts.get(key)
+    if box is None:
+        # box_convert() changes the structure, so it gets a copy
+        box = _layout_part(box_convert(covert_to_struct(json_str)))
+        _layouts[key] = box
+        if len(_layouts) > CACHE_SIZE:
+            _layouts.popitem(last=False)
+    else:
+        _layouts.move_to_end(key)
+
+    cache["layout"] = box
+    return box
+
+
+def render(struct_node: Node | CompactNode,
+           backend: Callable[[LayoutBox, int], T], text_size=100) -> T:
+    """
+    draws the structure with "backend", a function that takes the
+    layout and the text size (pixels per em)
+    """
+    return backend(layout(struct_node), text_size)
+
+
+def render_files(structures: dict[str, Node | CompactNode], directory: str,
+                 backend: Callable[[LayoutBox, int], str | bytes], extension: str,
+                 text_size=100) -> dict[str, Exception]:
+    """
+    Draws every structure to "<directory>/<name><extension>" with
+    "backend" (e.g. render_svg with ".svg" or render_png with ".png").
+
+    Structures that can't be drawn (see box_convert()) are skipped,
+    returns {name: error} for them.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    failed = {}
+    for name, struct_node in structures.items():
+        try:
+            result = render(struct_node, backend, text_size)
+        except (TypeError, ValueError, NotImplementedError) as error:
+            failed[name] = error
+            continue
+
+        file = os.path.join(directory, name + extension)
+        if isinstance(result, str):
+            with open(file, "w", encoding="utf-8") as f:
+                f.write(result)
+        else:
+            with open(file, "wb") as f:
+                f.write(result)
+
+    return failed
+
+
+def structure_image(struct_node: Node | CompactNode, text_size=100):
+    # PIL is only needed for drawing images
+    from .RasterRenderer import render_image
+
+    image = render(struct_node, render_image, text_size)
+    image.show()
+    return image
@@ -1,5 +1,92 @@
 from __future__ import annotations
 
+import os
+
+# set STRUCTURE_DEBUG to verify the registries against a full scan
+DEBUG = bool(os.environ.get("STRUCTURE_DEBUG"))
+
+# default amount of work point_simplify() may do per node, about 20 ms
+# on top of one pass over the children of the node
+POINT_SIMPLIFY_BUDGET = 20_000
+
+
+class Registry:
+    """
+    Keeps track of the members, heads and tails of a connected structure.
+
+    Registries are merged (union-find style) when two structures get
+    connected. Removing a connection might split the structure, so
+    that only marks the registry as dirty. A dirty registry gets
+    rebuilt the next time one of its nodes needs it.
+
+    "cache" stores things computed from the structure (snapshots,
+    automatons etc.), it's cleared whenever the structure changes.
+    """
+
+    __slots__ = ("parent", "members", "heads", "tails", "dirty", "cache")
+
+    def __init__(self):
+        self.parent: Registry | None = None
+        self.members: set[Node] = set()
+        self.heads: set[Node] = set()
+        self.tails: set[Node] = set()
+        self.dirty: bool = False
+        self.cache: dict = {}
+
+    def find(self) -> Registry:
+        root = self
+        while root.parent is not None:
+            root = root.parent
+
+        # path compression
+        registry = self
+        while registry.parent is not None:
+            registry.parent, registry = root, registry.parent
+
+        return root
+
+    def changed(self) -> None:
+        if self.cache:
+            self.cache = {}
+
+    def add(self, node: Node) -> None:
+        self.members.add(node)
+        if node.data == "head":
+            self.heads.add(node)
+        elif node.data == "tail":
+            self.tails.add(node)
+
+    def discard(self, node: Node) -> None:
+        self.members.discard(node)
+        self.heads.discard(node)
+        self.tails.discard(node)
+
+    def union(self, other: Registry) -> Registry:
+        """
+        merges the (root) registries and returns the new root
+        """
+        if self is other:
+            return self
+
+        if len(self.members) >= len(other.members):
+            big, small = self, other
+        else:
+            big, small = other, self
+        small.parent = big
+
+        big.members |= small.members
+        big.heads |= small.heads
+        big.tails |= small.tails
+        big.dirty |= small.dirty
+
+        small.members = set()
+        small.heads = set()
+        small.tails = set()
+        small.cache = {}
+
+        return big
+
+
 class Node:
     """
     WARNING!
@@ -27,13 +114,84 @@ class Node:
             "tail" the abs end (gets removed when merged)
             "point" always 'skipped' simplifies structures
         """
-        self.data: str = data
+        self._data: str = data
         self.children: set[Node] = set()
         self.parents: set[Node] = set()
 
+        self._registry = Registry()
+        self._registry.add(self)
+
     def __repr__(self):
         return self.data
 
+    @property
+    def data(self) -> str:
+        return self._data
+
+    @data.setter
+    def data(self, data: str) -> None:
+        # keep the head/tail registry in sync
+        registry = self._registry.find()
+        registry.changed()
+        if self._data == "head":
+            registry.heads.discard(self)
+        elif self._data == "tail":
+            registry.tails.discard(self)
+
+        self._data = data
+
+        if data == "head":
+            registry.heads.add(self)
+        elif data == "tail":
+            registry.tails.add(self)
+
+    @property
+    def registry(self) -> Registry:
+        """
+        the (up-to-date) registry of the structure
+        """
+        registry = self._registry.find()
+        self._registry = registry
+
+        if registry.dirty:
+            registry = Registry()
+            for node in self.traverse():
+                node._registry = registry
+                registry.add(node)
+
+        return registry
+
+    @property
+    def cache(self) -> dict:
+        """
+        see Registry
+        """
+        return self.registry.cache
+
+    def _join(self, other: Node) -> None:
+        """
+        merges the registries of self and other (after they got connected)
+        """
+        registry = self._registry.find().union(other._registry.find())
+        registry.changed()
+        self._registry = registry
+        other._registry = registry
+
+    def _isolate(self) -> None:
+        """
+        gives self its own registry (after it got disconnected)
+        """
+        registry = self._registry.find()
+        registry.changed()
+        if len(self.children) + len(self.parents) <= 1:
+            # removing a leaf can't split the structure
+            registry.discard(self)
+        else:
+            registry.dirty = True
+
+        self._registry = Registry()
+        self._registry.add(self)
+
     @property
     def siblings(self):
         out = set()
@@ -68,6 +226,10 @@ class Node:
     def remove_connection(self, child):
         self.children.remove(child)
         child.parents.remove(self)
+        # the structure might have been split in two
+        registry = self._registry.find()
+        registry.dirty = True
+        registry.changed()
 
     def add_connection(self, child):
         """
@@ -75,6 +237,7 @@ class Node:
         """
         self.children.add(child)
         child.parents.add(self)
+        self._join(child)
 
     def remove(self) -> None:
         """
@@ -86,6 +249,7 @@ class Node:
             child.parents.remove(self)
         for parent in self.parents:
             parent.children.remove(self)
+        self._isolate()
 
     def adopt(self, child) -> None:
         # remove head when merge
@@ -130,6 +294,7 @@ class Node:
 
         self.children = {other}
         other.parents = {self}
+        self._join(other)
 
     def r_insert(self, other) -> None:
         """
@@ -144,6 +309,7 @@ class Node:
 
         self.parents = {other}
         other.children = {self}
+        self._join(other)
 
     def contract(self) -> None:
         """
@@ -169,41 +335,59 @@ class Node:
     # </editor-fold>
 
     # <editor-fold desc="data retrieve">
+    def traverse(self):
+        """
+        yields every node in the structure exactly once (breadth first)
+        """
+        queue = [self]
+        cataloged = {self}
+        for node in queue:
+            yield node
+            for connection in (node.children, node.parents):
+                for other in connection:
+                    if other not in cataloged:
+                        cataloged.add(other)
+                        queue.append(other)
+
     def get_all(self) -> set[Node]:
-        last_len = 0
-        cataloged = set()
-        cataloged.add(self)
-        while len(cataloged) != last_len:
-            last_len = len(cataloged)
-            for thing in cataloged.copy():
-                cataloged |= thing.children
-                cataloged |= thing.parents
-        return cataloged
+        members = self.registry.members
+        if DEBUG:
+            scanned = set(self.traverse())
+            if scanned != members:
+                raise AssertionError(f"member registry out of sync: "
+                                     f"registered {members}, scanned {scanned}")
+
+        # copy since the structure is often changed while iterating
+        return members.copy()
 
     def get_head(self) -> Node:
-        head = []
-        for node in self.get_all():
-            if node.data == "head":
-                head.append(node)
+        head = self.registry.heads
+        if DEBUG:
+            self._check_registry("head", head)
 
         if len(head) == 1:
-            return head[0]
+            return next(iter(head))
         if len(head) == 0:
             raise TypeError("0 heads found")
         raise TypeError("multiple heads found")
 
     def get_tail(self) -> Node:
-        tail = []
-        for node in self.get_all():
-            if node.data == "tail":
-                tail.append(node)
+        tail = self.registry.tails
+        if DEBUG:
+            self._check_registry("tail", tail)
 
         if len(tail) == 1:
-            return tail[0]
+            return next(iter(tail))
         if len(tail) == 0:
             raise TypeError("0 tails found")
         raise TypeError("multiple tails found")
 
+    def _check_registry(self, data: str, registered: set[Node]) -> None:
+        scanned = {node for node in self.traverse() if node.data == data}
+        if scanned != registered:
+            raise AssertionError(f"{data} registry out of sync: "
+                                 f"registered {registered}, scanned {scanned}")
+
     def weak_connections(self) -> set[Node]:
         """
         all nodes that eventually connects to node without any intermediate text-nodes
@@ -277,42 +461,74 @@ class Node:
             if node.data == "tail" and node.children:
                 node.contract()
 
-    def point_simplify(self):
+    def point_simplify(self, budget: int = POINT_SIMPLIFY_BUDGET):
         """
         Tries to visually simplify the structure by creating points where
         multiple things connects to the same nodes.
+
+        The groups of children that share parents are found greedily,
+        which is polynomial in the amount of children. "budget" limits
+        the work per node (searching for groups and then applying them),
+        when it runs out the groups applied so far are kept.
         """
-        def recursion(n=0) -> list[list[list, set]]:
+        def shared_parent_groups() -> list[tuple[set[Node], set[Node]]]:
             """
-            gets all permutations of different children inside "possible" (effectively)
-            eg the children p[1], p[2], p[5] (p = possible)
-            also returns their collective parents p[1].a & p[2].a & p[5].a (a = parents)
-            returns [[[children], {collective parents}], ...]
-            return list will also contain [[], None] the empty type
+            Greedily grows a group from every child in "possible" by
+            adding the children that shares the most of the groups
+            collective parents (as long as at least 2 are shared).
+            Every step of the way is a group option.
+            returns [({children}, {collective parents}), ...]
             """
+            nonlocal work
 
-            # [[children],{collective_parents}]
-            if n == len(possible) - 1:
-                return [[
-                    [], None
-                ], [
-                    [possible[n][0]], set(possible[n][1])
-                ]]
+            # bitsets of the (weakly connected) parents
+            parent_bits: dict[Node, int] = {}
+            masks = []
+            for _, parents in possible:
+                mask = 0
+                for parent in parents:
+                    mask |= 1 << parent_bits.setdefault(parent, len(parent_bits))
+                masks.append(mask)
+            bit_parents = list(parent_bits)
 
             out = []
-            for part in recursion(n + 1):
-                if part[1] is None:
-                    out.append([[], None])
-                    out.append([[possible[n][0]], set(possible[n][1])])
-                else:
-                    out.append(part)
-
-                    collective_parents = part[1] & possible[n][1]
-                    if len(collective_parents) >= 2:
-                        out.append([
-                            part[0] + [possible[n][0]],
-                            collective_parents
-                        ])
+            found = set()
+            for seed in range(len(possible)):
+                if work + len(possible) > budget // 2:
+                    break
+
+                mask = masks[seed]
+                group = [seed]
+
+                candidates = sorted(
+                    (i for i in range(len(possible)) if i != seed),
+                    key=lambda i: (masks[i] & mask).bit_count(), reverse=True)
+                work += len(candidates)
+
+                for i in candidates:
+                    collective_mask = mask & masks[i]
+                    work += 1
+                    if work > budget // 2:
+                        break
+                    if collective_mask.bit_count() < 2:
+                        continue
+
+                    mask = collective_mask
+                    group.append(i)
+
+                    key = (frozenset(group), mask)
+                    if key not in found:
+                        found.add(key)
+                        work += len(group) + len(bit_parents)
+                        out.append((
+                            {possible[j][0] for j in group},
+                            {bit_parents[bit] for bit in range(len(bit_parents))
+                             if mask >> bit & 1}
+                        ))
+
+                # leave half of the budget for applying the groups
+                if work > budget // 2:
+                    break
 
             return out
 
@@ -322,44 +538,35 @@ class Node:
                 continue
 
             # all children of
-            possible: list[tuple[Node, set[node]]] = []
+            possible: list[tuple[Node, set[Node]]] = []
             for child in node.children:
                 weak_connections = child.weak_connections()
                 if len(weak_connections) >= 2:
                     possible.append((child, weak_connections))
 
-            if len(possible) == 0:
+            if len(possible) < 2:
                 continue
 
-            temp = recursion()
-
-            connection_options = []
-            possible_connection_options = []
-
-            for thing in temp:
-                children, parents = thing
-
-                if len(children) >= 2 and parents is not None:
-                    possible_connection_options.append((set(thing[0]), parents))
-
-            while len(possible_connection_options) > 0:
-
-                for i, option in enumerate(possible_connection_options):
-                    direct_parents = []
-                    children, parents = option
+            work = 0
+            connection_options = shared_parent_groups()
 
-                    for child in children:
-                        direct_parents += child.parents & parents
+            while len(connection_options) > 0:
+                # only use groups that are (still) mostly directly connected
+                best = None
+                best_direct = 0
+                for i, (children, parents) in enumerate(connection_options):
+                    work += len(children)
+                    if work > budget:
+                        break
+                    direct = sum(len(child.parents & parents) for child in children)
 
-                    if len(direct_parents) >= max(len(parents), len(children)):
-                        connection_options.append((i, direct_parents, children, parents))
+                    if direct >= max(len(parents), len(children)) and direct > best_direct:
+                        best, best_direct = i, direct
 
-                if len(connection_options) == 0:
+                if best is None or work > budget:
                     break
 
-                i, _, children, parents = \
-                    max(connection_options, key=lambda x: len(x[1]))
-                possible_connection_options.pop(i)
+                children, parents = connection_options.pop(best)
 
                 for child in children:
                     for parent in child.parents & parents:
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from io import BytesIO
+from math import ceil
+
+from PIL import Image, ImageFont, ImageDraw
+
+from .Bezier import bezier
+from .Layout import LayoutBox, CHAR_BACKGROUND, TEXT_COLOR, LINE_COLOR
+
+# used if it's installed, otherwise Pillow's default font
+FONT = "arial.ttf"
+
+# points per bezier curve, fewer for small curves (about one per 2 pixels)
+CURVE_STEPS = 100
+
+_fonts: dict[int, ImageFont.FreeTypeFont | ImageFont.ImageFont] = {}
+
+
+def load_font(text_size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    font = _fonts.get(text_size)
+    if font is not None:
+        return font
+
+    try:
+        font = ImageFont.truetype(FONT, text_size)
+    except OSError:
+        try:
+            font = ImageFont.load_default(text_size)
+        except TypeError:
+            # Pillow < 10.1, only has a (small) bitmap font
+            font = ImageFont.load_default()
+
+    _fonts[text_size] = font
+    return font
+
+
+def render_image(box: LayoutBox, text_size=100, background=(0, 0, 0, 0)) -> Image.Image:
+    """
+    draws the layout on an image (transparent by default),
+    "text_size" pixels per em
+    """
+    font = load_font(text_size)
+
+    image = Image.new("RGBA", (max(1, ceil(box.width * text_size)),
+                               max(1, ceil(box.height * text_size))), background)
+    draw = ImageDraw.Draw(image)
+    _draw_box(draw, font, box, 0, 0, text_size)
+    return image
+
+
+def render_png(box: LayoutBox, text_size=100) -> bytes:
+    """
+    the layout as png (with a white background), never opens a window
+    """
+    buffer = BytesIO()
+    render_image(box, text_size, (255, 255, 255, 255)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _draw_box(draw: ImageDraw.ImageDraw, font, box: LayoutBox,
+              x: float, y: float, scale: float) -> None:
+    if box.text is not None:
+        if box.text:
+            draw.rectangle((x, y, x + box.width * scale, y + box.height * scale),
+                           fill=CHAR_BACKGROUND)
+
+            # centered, works for bitmap fonts as well (unlike anchor="mm")
+            left, top, right, bottom = draw.textbbox((0, 0), box.text, font=font)
+            draw.text((x + (box.width * scale - left - right) / 2,
+                       y + (box.height * scale - top - bottom) / 2),
+                      box.text, fill=TEXT_COLOR, font=font)
+        return
+
+    for segment in box.segments:
+        points = [(x + point_x * scale, y + point_y * scale) for point_x, point_y in segment]
+        length = abs(points[-1][0] - points[0][0]) + abs(points[-1][1] - points[0][1])
+        if length < 0.5:
+            # zero length (less than a pixel), would be a dot
+            continue
+        if len(points) == 4:
+            points = bezier(points, min(CURVE_STEPS, max(4, ceil(length / 2))))
+        draw.line(points, fill=LINE_COLOR)
+
+    for child_x, child_y, child in box.children:
+        _draw_box(draw, font, child, x + child_x * scale, y + child_y * scale, scale)
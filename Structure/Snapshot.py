@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from . import Node
+
+# nodes that are always 'skipped' when matching text
+EPSILON_DATA = ("point", "head", "tail")
+
+
+def char_successors(node: Node) -> set[Node]:
+    """
+    all char nodes that directly follows node (skipping points etc.)
+    """
+    out = set()
+    queue = list(node.children)
+    cataloged = set(queue)
+    for child in queue:
+        if child.data in EPSILON_DATA:
+            for sub_child in child.children:
+                if sub_child not in cataloged:
+                    cataloged.add(sub_child)
+                    queue.append(sub_child)
+        elif len(child.data) == 1:
+            out.add(child)
+    return out
+
+
+def reaches_end(node: Node) -> bool:
+    """
+    if the end of the structure can be reached from node without
+    matching any more chars
+    """
+    queue = [node]
+    cataloged = {node}
+    for thing in queue:
+        if thing.data == "tail" and not thing.children:
+            return True
+        for child in thing.children:
+            if child.data in EPSILON_DATA and child not in cataloged:
+                cataloged.add(child)
+                queue.append(child)
+    return False
+
+
+class Snapshot:
+    """
+    Read only copy of a structure, used for matching text.
+
+    The nodes are numbered and the epsilon closures (all char nodes
+    directly following a node, skipping points and inner heads/tails)
+    are computed once. Nothing in here changes after creation, so it
+    can be used from multiple threads at once.
+
+    closures[i] maps a char to the nodes it can lead to from node i
+    start are the heads (without parents)
+    ends are the nodes that can reach the tail without matching
+    any more chars
+    """
+
+    __slots__ = ("nodes", "closures", "start", "ends")
+
+    def __init__(self, struct_node: Node):
+        self.nodes: tuple[Node, ...] = tuple(struct_node.traverse())
+        ids = {node: i for i, node in enumerate(self.nodes)}
+
+        closures = []
+        for node in self.nodes:
+            closure: dict[str, list[int]] = {}
+            for successor in char_successors(node):
+                closure.setdefault(successor.data, []).append(ids[successor])
+            closures.append({char: tuple(sorted(successors))
+                             for char, successors in closure.items()})
+
+        self.closures: tuple[dict[str, tuple[int, ...]], ...] = tuple(closures)
+        self.start: frozenset[int] = frozenset(
+            ids[node] for node in self.nodes
+            if node.data == "head" and not node.parents)
+        self.ends: frozenset[int] = frozenset(
+            i for i, node in enumerate(self.nodes) if reaches_end(node))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def step(self, states: frozenset[int], char: str) -> frozenset[int]:
+        closures = self.closures
+        next_states = set()
+        for state in states:
+            next_states.update(closures[state].get(char, ()))
+        return frozenset(next_states)
+
+    def check(self, text: str) -> bool:
+        states = self.start
+        for char in text:
+            states = self.step(states, char)
+            if not states:
+                return False
+        return not self.ends.isdisjoint(states)
+
+
+def snapshot(struct_node: Node) -> Snapshot:
+    """
+    the (cached) snapshot of the structure that "struct_node" is part of
+    """
+    cache = struct_node.cache
+    out = cache.get("snapshot")
+    if out is None:
+        out = cache["snapshot"] = Snapshot(struct_node)
+    return out
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from math import ceil
+from xml.sax.saxutils import escape
+
+from .Layout import LayoutBox, CHAR_BACKGROUND, TEXT_COLOR, LINE_COLOR
+
+FONT_FAMILY = "Arial, Helvetica, sans-serif"
+
+
+def _number(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def _color(color: tuple[int, int, int]) -> str:
+    return "rgb({},{},{})".format(*color)
+
+
+def render_svg(box: LayoutBox, text_size=100) -> str:
+    """
+    the layout as an svg document, "text_size" pixels per em
+
+    The chars are <text> elements and all lines are one <path>
+    (bezier curves stay curves), the viewer picks the font.
+    """
+    rects = []
+    texts = []
+    path = []
+    _add_box(box, 0, 0, text_size, rects, texts, path)
+
+    width = max(1, ceil(box.width * text_size))
+    height = max(1, ceil(box.height * text_size))
+    return "\n".join([
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">',
+        f'<g fill="{_color(CHAR_BACKGROUND)}">',
+        *rects,
+        '</g>',
+        f'<path fill="none" stroke="{_color(LINE_COLOR)}" d="{" ".join(path)}"/>',
+        f'<g fill="{_color(TEXT_COLOR)}" font-family="{FONT_FAMILY}" font-size="{text_size}" '
+        f'text-anchor="middle" dominant-baseline="central">',
+        *texts,
+        '</g>',
+        '</svg>',
+        ""])
+
+
+def _add_box(box: LayoutBox, x: float, y: float, scale: float,
+             rects: list[str], texts: list[str], path: list[str]) -> None:
+    if box.text is not None:
+        if box.text:
+            rects.append(f'<rect x="{_number(x)}" y="{_number(y)}" '
+                         f'width="{_number(box.width * scale)}" height="{_number(box.height * scale)}"/>')
+            texts.append(f'<text x="{_number(x + box.width * scale / 2)}" '
+                         f'y="{_number(y + box.height * scale / 2)}" xml:space="preserve">'
+                         f'{escape(box.text)}</text>')
+        return
+
+    for segment in box.segments:
+        points = [f"{_number(x + point_x * scale)} {_number(y + point_y * scale)}"
+                  for point_x, point_y in segment]
+        if points[0] == points[-1]:
+            # zero length (e.g. a box exactly as wide as its column)
+            continue
+        if len(points) == 4:
+            path.append(f"M {points[0]} C {points[1]} {points[2]} {points[3]}")
+        else:
+            path.append(f"M {points[0]} L {points[1]}")
+
+    for child_x, child_y, child in box.children:
+        _add_box(child, x + child_x * scale, y + child_y * scale, scale, rects, texts, path)
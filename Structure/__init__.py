@@ -1,4 +1,13 @@
 from .Node import Node
 from .Other import StructureType
-from .DisplayStructure import structure_image
-from .CheckCorrect import check_correct
+from .CompactGraph import CompactGraph, CompactNode, freeze
+from .Forest import Forest
+from .ConvertCache import ConvertCache, CONVERT_CACHE
+from .Layout import LayoutBox, layout, render, render_files, structure_image
+from .SvgRenderer import render_svg
+from .Snapshot import Snapshot, snapshot
+from .CheckCorrect import check_correct, check_correct_many
+from .Automaton import Automaton, LazyAutomaton, Matcher, compile_structure, equivalent, minimize
+from .Automaton import union, intersection, difference, concatenation
+from .EditDistance import edit_distance
+from .Language import accepted_strings, count_accepted
@@ -3,7 +3,7 @@
 
 
 from . import Node, StructureType
-from DisplayStructure import structure_image
+from .Layout import structure_image
 
 # a = convert("hello")
 # b = convert("hi")
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from Structure import (compile_structure, concatenation, difference, equivalent, intersection,
+                       minimize, union)
+from Structure.Blueprint import QUIZ_BLUEPRINT, compile_blueprint
+from Structure.Constructor import or_convert
+
+from tests.test_edit_distance import loop
+
+
+def automaton(text: str):
+    return compile_structure(or_convert(text))
+
+
+def test_lazy_canonical_key():
+    a = automaton("ab/c")
+    b = automaton("c/d")
+
+    assert union(a, b).canonical_key() == automaton("ab/c/d").canonical_key()
+    assert intersection(a, b).canonical_key() == automaton("c").canonical_key()
+    assert difference(a, b).canonical_key() == automaton("ab").canonical_key()
+    assert concatenation(b, b).canonical_key() == automaton("cc/cd/dc/dd").canonical_key()
+
+
+def test_lazy_len_counts_all_states():
+    a = automaton("abc")
+    b = automaton("abd")
+
+    lazy = union(a, b)
+    assert lazy.check("ab") is False  # only reaches part of the states
+    # "", "a", "ab", "abc" and "abd"
+    assert len(lazy) == 5
+    assert all(state_transitions is not None for state_transitions in lazy.transitions)
+
+
+def unrolled_loop():
+    """
+    (ab)+ with every other "ab" as its own nodes
+    """
+    head = or_convert("abab")
+    a_1 = next(iter(head.children))
+    b_1 = next(iter(a_1.children))
+    b_2 = next(iter(head.get_tail().parents))
+    b_1.add_connection(head.get_tail())
+    b_2.add_connection(a_1)
+    return head
+
+
+def test_equivalent_pairs():
+    program = compile_blueprint(QUIZ_BLUEPRINT)
+    assert equivalent(program.convert("(el) perro"), or_convert("el perro/perro"))
+    assert equivalent(program.convert("rojo, -a"), or_convert("rojo/roja"))
+    assert equivalent(or_convert("ab/c"), or_convert("c/ab/c"))
+    assert equivalent(loop("ab"), unrolled_loop())
+
+
+def test_not_equivalent_pairs():
+    assert not equivalent(or_convert("ab"), or_convert("abc"))
+    assert not equivalent(or_convert("ab/ac"), or_convert("ab"))
+    assert not equivalent(or_convert("/a"), or_convert("a"))
+    assert not equivalent(loop("ab"), or_convert("ab/abab"))
+    assert not equivalent(or_convert("ab"), or_convert("ba"))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_equivalent_matches_the_texts(seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        a, b = ("/".join("".join(rng.choice("ab") for _ in range(rng.randint(0, 3)))
+                         for _ in range(rng.randint(1, 4))) for _ in range(2))
+        assert equivalent(or_convert(a), or_convert(b)) == (set(a.split("/")) == set(b.split("/")))
+
+
+def test_minimize():
+    struct = or_convert("abc/abd/xbc/xbd")
+    minimal = minimize(struct)
+
+    assert equivalent(minimal, struct)
+    # a/x, b, c/d, head and tail
+    assert len(minimal.get_all()) == 7
+    assert len(minimize(minimal).get_all()) == 7
+
+
+def test_canonical_key_is_stable():
+    key = automaton("ab/c/abd").canonical_key()
+    assert automaton("abd/c/ab").canonical_key() == key
+    assert compile_structure(minimize(or_convert("c/ab/abd"))).canonical_key() == key
+    assert automaton("ab/c/abd").canonical_key() == key
+    assert automaton("ab/c/abe").canonical_key() != key
+    assert hash(key) == hash(automaton("c/abd/ab").canonical_key())
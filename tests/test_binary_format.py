@@ -0,0 +1,105 @@
+import pytest
+
+from Structure import CompactGraph
+from Structure.BinaryFormat import MAGIC, VERSION, _write_varint, from_buffer, load, save, to_bytes
+from Structure.Blueprint import QUIZ_BLUEPRINT, compile_blueprint
+
+WORDS = ["hola", "(el) invierno", "rojo, -a", "perro/gato; can", "año", ""]
+
+
+def make_graph(words) -> CompactGraph:
+    program = compile_blueprint(QUIZ_BLUEPRINT)
+    graph = CompactGraph()
+    for word in words:
+        graph.add(program.convert(word))
+    return graph
+
+
+def assert_same(graph: CompactGraph, loaded: CompactGraph) -> None:
+    assert loaded.labels == graph.labels
+    assert loaded.data == graph.data
+    assert loaded.child_offsets == graph.child_offsets
+    assert loaded.child_targets == graph.child_targets
+    assert loaded.parent_offsets == graph.parent_offsets
+    for i in range(len(graph)):
+        assert sorted(loaded.parents_of(i)) == sorted(graph.parents_of(i))
+    assert loaded.structure_of == graph.structure_of
+    assert loaded.starts == graph.starts
+    assert loaded.heads == graph.heads
+    assert loaded.tails == graph.tails
+
+
+def encode(labels, nodes, structures) -> bytes:
+    """
+    hand made file, nodes are (label id, [child deltas (before zigzag)])
+    and structures (size, head + 1, tail + 1)
+    """
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    for value in (len(labels), len(nodes), len(structures)):
+        _write_varint(out, value)
+    for label in labels:
+        _write_varint(out, len(label.encode()))
+        out += label.encode()
+    for label_id, deltas in nodes:
+        _write_varint(out, label_id)
+        _write_varint(out, len(deltas))
+        for delta in deltas:
+            _write_varint(out, delta << 1 if delta >= 0 else (-delta << 1) - 1)
+    for structure in structures:
+        for value in structure:
+            _write_varint(out, value)
+    return bytes(out)
+
+
+@pytest.mark.parametrize("words", [[], [""], ["a"], WORDS])
+def test_round_trip(words, tmp_path):
+    graph = make_graph(words)
+    assert_same(graph, from_buffer(to_bytes(graph)))
+
+    if words:
+        save(graph, tmp_path / "graph")
+        assert_same(graph, load(tmp_path / "graph"))
+
+
+def test_hand_made_file():
+    graph = from_buffer(encode(["head", "a", "tail"], [(0, [1]), (1, [1]), (2, [])], [(3, 1, 3)]))
+    assert [graph.label(i) for i in range(3)] == ["head", "a", "tail"]
+    assert list(graph.children_of(0)) == [1]
+    assert list(graph.parents_of(2)) == [1]
+
+
+def test_truncated():
+    data = to_bytes(make_graph(WORDS))
+    for size in range(len(data)):
+        with pytest.raises(TypeError):
+            from_buffer(data[:size])
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"SGRF",
+    b"XXXX\x01",
+    MAGIC + bytes([VERSION + 1]),
+    # label id out of range
+    encode(["a"], [(1, [])], [(1, 0, 0)]),
+    # child before the first node / after the last node
+    encode(["a"], [(0, [-1])], [(1, 0, 0)]),
+    encode(["a"], [(0, [1])], [(1, 0, 0)]),
+    # structure larger than the graph, head outside of the structure
+    encode(["a"], [(0, [])], [(2, 0, 0)]),
+    encode(["a"], [(0, [])], [(1, 2, 0)]),
+    # nodes that aren't in any structure
+    encode(["a"], [(0, []), (0, [])], [(1, 0, 0)]),
+    # trailing data
+    encode(["a"], [(0, [])], [(1, 0, 0)]) + b"\x00",
+])
+def test_corrupt(data):
+    with pytest.raises(TypeError):
+        from_buffer(data)
+
+
+def test_empty_file(tmp_path):
+    (tmp_path / "empty").write_bytes(b"")
+    with pytest.raises(TypeError):
+        load(tmp_path / "empty")
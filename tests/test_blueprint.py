@@ -0,0 +1,74 @@
+from itertools import product
+
+import pytest
+
+from Structure import accepted_strings
+from Structure.Blueprint import QUIZ_BLUEPRINT, TempName, compile_blueprint, config_blueprint
+from Structure.Helpers import OrStatement
+
+from Benchmarks.forest import book_words
+
+PROGRAM = compile_blueprint(QUIZ_BLUEPRINT)
+
+
+@pytest.mark.parametrize("text, expected", [
+    # between_greedy
+    ("make; man", {"make", "man"}),
+    ("om; i fall", {"om", "i fall"}),
+    # between_optional
+    ("(la) cocina", {"cocina", "la cocina"}),
+    ("(el) novio; (la) novia", {"el novio", "novio", "la novia", "novia"}),
+    ("(el) álbum de familia", {"el álbum de familia", "álbum de familia"}),
+    # between_permissive
+    ("Hace buen/mal tiempo", {"Hace buen tiempo", "Hace mal tiempo"}),
+    ("Javisst, Självklart", {"Javisst", "Självklart"}),
+    ("bred gata, aveny", {"bred gata", "bred aveny"}),
+    # replace
+    ("rojo, -a", {"rojo", "roja"}),
+    ("bueno, -a, -as, -os", {"bueno", "buena", "buenas", "buenos"}),
+    # optional
+    ("dormir /ue/", {"dormir", "dormir /ue/"}),
+    ("tener ... años", {"tener años", "tener ... años"}),
+    ("Quiero... por favor", {"Quiero por favor", "Quiero... por favor"}),
+    ("tener ganas de", {"tener ganas", "tener ganas de"}),
+    ("hoy", {"hoy"}),
+])
+def test_quiz_rules(text, expected):
+    assert set(accepted_strings(PROGRAM.convert(text))) == expected
+
+
+def texts_of_units(program, text: str) -> set[str]:
+    """
+    the texts of the tokens, one option per unit (what the rules
+    would give applied to the text one by one)
+    """
+    return {"".join(options) for units in program.parse(text) for options in product(*units)}
+
+
+@pytest.mark.parametrize("blueprint", [
+    QUIZ_BLUEPRINT,
+    config_blueprint({"split_keys": [";", ","], "remove_between_keys": [["(", ")"], ["[", "]"]]}),
+])
+def test_structure_matches_the_tokens_on_book_words(blueprint):
+    program = compile_blueprint(blueprint)
+    for word in book_words():
+        assert set(accepted_strings(program.convert(word))) == texts_of_units(program, word), word
+
+
+def test_config_blueprint():
+    blueprint = dict(config_blueprint({"split_keys": ["|"],
+                                       "remove_between_keys": [["[", "]"], ["/", "/"]],
+                                       "remove_keys": ["etc."]}))
+    assert blueprint[TempName.between_greedy] == ("|",)
+    assert blueprint[TempName.between_optional] == (("[", "]"),)
+    assert blueprint[TempName.optional][-1] == "etc."
+
+    assert config_blueprint({}) == tuple(QUIZ_BLUEPRINT)
+
+
+def test_unknown_rule():
+    with pytest.raises(TypeError):
+        compile_blueprint((("between_maybe", (";",)),))
+    # OrStatement or a plain tuple of options
+    program = compile_blueprint(((TempName.replace, (("x", OrStatement("a", "b")), ("y", ("c", "d")))),))
+    assert set(accepted_strings(program.convert("xy"))) == {"ac", "ad", "bc", "bd"}
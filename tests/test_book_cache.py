@@ -0,0 +1,70 @@
+import json
+import os
+import pickle
+
+from Structure.BookCache import BookCache
+from Structure.Constructor import convert
+
+
+def make_book(directory):
+    config_file = os.path.join(directory, "config.json")
+    with open(config_file, "w") as file:
+        file.write("{}")
+
+    part_file = os.path.join(directory, "part.json")
+    with open(part_file, "w") as file:
+        json.dump([["hola", "hello"], ["perro", "dog"]], file)
+    return config_file, part_file
+
+
+def counting_convert(calls):
+    def func(text):
+        calls.append(text)
+        return convert(text, {})
+    return func
+
+
+def test_reads_cache(tmp_path):
+    config_file, part_file = make_book(tmp_path)
+    calls = []
+
+    first = BookCache(config_file).load_part(part_file, counting_convert(calls))
+    second = BookCache(config_file).load_part(part_file, counting_convert(calls))
+
+    assert len(calls) == 4
+    assert [pair for pair, *_ in second] == [["hola", "hello"], ["perro", "dog"]]
+    assert second[0][1].cache["automaton"].check("hola")
+    assert not second[0][1].cache["automaton"].check("hol")
+    assert [pair for pair, *_ in first] == [pair for pair, *_ in second]
+
+
+def test_converters_have_own_files(tmp_path):
+    config_file, part_file = make_book(tmp_path)
+    calls = []
+
+    for _ in range(2):
+        BookCache(config_file, "a").load_part(part_file, counting_convert(calls))
+        BookCache(config_file, "b").load_part(part_file, counting_convert(calls))
+
+    assert len(calls) == 8
+
+
+def test_bad_cache_files_are_rebuilt(tmp_path):
+    config_file, part_file = make_book(tmp_path)
+    book_cache = BookCache(config_file)
+    calls = []
+    book_cache.load_part(part_file, counting_convert(calls))
+
+    cache_file = book_cache.cache_file(part_file)
+    with open(cache_file, "rb") as file:
+        valid = file.read()
+
+    for content in (b"", b"garbage", valid[:-3], valid[:20],
+                    pickle.dumps(("not", "a", "cache"))):
+        with open(cache_file, "wb") as file:
+            file.write(content)
+
+        calls.clear()
+        part = book_cache.load_part(part_file, counting_convert(calls))
+        assert len(calls) == 4
+        assert part[1][2].cache["automaton"].check("dog")
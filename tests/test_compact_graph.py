@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from Structure import CompactGraph, CompactNode, Node, accepted_strings, freeze
+from Structure.Blueprint import QUIZ_BLUEPRINT, compile_blueprint
+from Structure.Constructor import convert_linear_word
+from Structure.JsonConverter import covert_to_json
+
+from Benchmarks.forest import book_words
+from tests.test_json_converter import random_structure
+
+
+def structures() -> list[Node]:
+    program = compile_blueprint(QUIZ_BLUEPRINT)
+    rng = random.Random(0)
+    return [program.convert(word) for word in book_words()[:100]] + \
+        [random_structure(rng) for _ in range(50)]
+
+
+def assert_same_graph(struct_node: Node, frozen: CompactNode):
+    """
+    frozen exposes the same data and connections as the structure
+    of struct_node, ids are given in traverse() order
+    """
+    nodes = list(struct_node.traverse())
+    frozen_nodes = list(frozen.traverse())
+    assert len(frozen_nodes) == len(nodes)
+    assert frozen.get_all() == set(frozen_nodes)
+
+    to_frozen = dict(zip(nodes, frozen_nodes))
+    assert to_frozen[struct_node] == frozen
+    assert frozen.get_head() == to_frozen[struct_node.get_head()]
+    assert frozen.get_tail() == to_frozen[struct_node.get_tail()]
+    for node, frozen_node in to_frozen.items():
+        assert frozen_node.data == node.data
+        assert frozen_node.children == {to_frozen[child] for child in node.children}
+        assert frozen_node.parents == {to_frozen[parent] for parent in node.parents}
+
+
+@pytest.mark.parametrize("struct", structures())
+def test_same_children_and_labels(struct):
+    frozen = freeze(struct)
+    assert_same_graph(struct, frozen)
+
+    assert covert_to_json(frozen.to_node()) == covert_to_json(struct)
+    assert list(accepted_strings(frozen, 50)) == list(accepted_strings(struct, 50))
+
+
+def test_many_structures_in_one_graph():
+    graph = CompactGraph()
+    words = structures()[:20]
+    frozen = [graph.add(struct) for struct in words]
+    assert len(graph) == sum(len(struct.get_all()) for struct in words)
+    assert len(graph.labels) == len({node.data for struct in words for node in struct.get_all()})
+
+    for struct, frozen_struct in zip(words, frozen):
+        assert_same_graph(struct, frozen_struct)
+        for node in frozen_struct.traverse():
+            assert node.get_head() == frozen_struct.get_head()
+            assert node.get_all() == frozen_struct.get_all()
+
+    assert frozen[0].cache is not frozen[1].cache
+    assert frozen[0].cache is frozen[0].get_tail().cache
+
+
+def test_no_head_or_tail():
+    struct = convert_linear_word("ab")
+    struct.get_head().remove()
+    frozen = freeze(struct)
+    with pytest.raises(TypeError):
+        frozen.get_head()
+    assert frozen.get_tail().data == "tail"
+
+
+def test_read_only():
+    struct = convert_linear_word("ab")
+    frozen = freeze(struct)
+    with pytest.raises(TypeError):
+        frozen.add_connection(frozen)
+    with pytest.raises(TypeError):
+        frozen.get_head().remove()
+
+    copy = frozen.to_node()
+    copy.get_tail().remove()
+    assert list(accepted_strings(frozen)) == list(accepted_strings(struct)) == ["ab"]
@@ -0,0 +1,73 @@
+from Structure import CONVERT_CACHE, CompactNode, ConvertCache, accepted_strings
+from Structure.Blueprint import QUIZ_BLUEPRINT, compile_blueprint
+from Structure.Constructor import convert, convert_linear_word
+from Structure.ConvertCache import config_key
+
+
+def counting_convert():
+    converted = []
+
+    def convert_func(text):
+        converted.append(text)
+        return convert_linear_word(text)
+    return convert_func, converted
+
+
+def test_hit_and_miss():
+    cache = ConvertCache()
+    convert_func, converted = counting_convert()
+
+    first = cache.get("hola", "key", convert_func)
+    assert isinstance(first, CompactNode)
+    assert cache.get("hola", "key", convert_func) is first
+    assert cache.get("hola", "other key", convert_func) is not first
+    assert converted == ["hola", "hola"]
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 2)
+
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+def test_lru_eviction():
+    cache = ConvertCache(max_size=2)
+    convert_func, converted = counting_convert()
+
+    cache.get("a", "key", convert_func)
+    cache.get("b", "key", convert_func)
+    cache.get("a", "key", convert_func)  # "b" is now the oldest
+    cache.get("c", "key", convert_func)
+    assert len(cache) == 2
+
+    cache.get("a", "key", convert_func)
+    cache.get("b", "key", convert_func)
+    assert converted == ["a", "b", "c", "b"]
+
+
+def test_frozen_structures_are_shared():
+    cache = ConvertCache()
+    first = convert("hola", [], cache)
+    second = convert("hola", [], cache)
+    assert first is second
+    assert list(accepted_strings(first)) == ["hola"]
+
+    # a mutable copy doesn't change the cached structure
+    copy = first.to_node()
+    copy.get_head().data = "x"
+    assert list(accepted_strings(convert("hola", [], cache))) == ["hola"]
+
+
+def test_config_key():
+    assert config_key({"a": 1, "b": [1, 2]}) == config_key({"b": [1, 2], "a": 1})
+    assert config_key({"a": 1}) != config_key({"a": 2})
+    assert config_key(QUIZ_BLUEPRINT) == compile_blueprint(QUIZ_BLUEPRINT).key
+
+
+def test_words_and_get_words_share_the_cache():
+    from Quiz.other import GetWords, Words
+
+    assert Words.CONVERT_CACHE is CONVERT_CACHE
+    assert GetWords.CONVERT_CACHE is CONVERT_CACHE
+
+    program = Words.temp_program({})
+    assert program.cache is CONVERT_CACHE
+    assert program.convert("(el) gato") is compile_blueprint(QUIZ_BLUEPRINT, CONVERT_CACHE).convert("(el) gato")
@@ -0,0 +1,127 @@
+import random
+
+import pytest
+
+from Structure import Node, equivalent
+from Structure.Blueprint import QUIZ_BLUEPRINT, compile_blueprint
+from Structure.Constructor import or_convert
+from Structure.DisplayStructure import behind, box_convert, get_sectioned_list, in_front
+from Structure.JsonConverter import covert_to_json, covert_to_struct
+
+
+def random_dag(rng: random.Random, size: int) -> list[Node]:
+    nodes = [Node("head")]
+    for i in range(1, size):
+        node = Node(chr(ord("a") + i))
+        for parent in rng.sample(nodes, rng.randint(1, min(3, len(nodes)))):
+            parent.add_connection(node)
+        nodes.append(node)
+    return nodes
+
+
+def paths_from(node: Node):
+    if not node.children:
+        yield [node]
+    for child in node.children:
+        for path in paths_from(child):
+            yield [node] + path
+
+
+def dominator_sets(nodes: list[Node]) -> dict[Node, set[Node]]:
+    """
+    every node => the nodes on all paths from the head to it
+    """
+    out = {}
+    for path in paths_from(nodes[0]):
+        for i, node in enumerate(path):
+            out[node] = out.get(node, set(path[:i + 1])) & set(path[:i + 1])
+    return out
+
+
+def post_dominator_sets(nodes: list[Node]) -> dict[Node, set[Node]]:
+    """
+    every node => the nodes on all paths from it to the (virtual) exit
+    """
+    out = {}
+    for node in nodes:
+        for path in paths_from(node):
+            out[node] = out.get(node, set(path)) & set(path)
+    return out
+
+
+def last_on_path(path: list[Node], candidates: set[Node]) -> Node | None:
+    found = [node for node in path if node in candidates]
+    return found[-1] if found else None
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_dominators_match_paths(seed):
+    rng = random.Random(seed)
+    nodes = random_dag(rng, rng.randint(2, 10))
+    sectioned_list = get_sectioned_list(nodes[0])
+    dominators = dominator_sets(nodes)
+    post_dominators = post_dominator_sets(nodes)
+
+    for node in nodes:
+        any_path_to = next(path for path in paths_from(nodes[0]) if node in path)
+        path_to = any_path_to[:any_path_to.index(node)]
+        assert sectioned_list.immediate_dominator(node) == \
+            last_on_path(path_to, dominators[node] - {node})
+
+        path_from = next(paths_from(node))[1:]
+        first = [child for child in path_from if child in post_dominators[node]]
+        assert sectioned_list.immediate_post_dominator(node) == (first[0] if first else None)
+
+    for _ in range(10):
+        group = rng.sample(nodes, rng.randint(1, len(nodes)))
+
+        shared = set.intersection(*(dominators[node] for node in group))
+        path = next(path for path in paths_from(nodes[0]) if group[0] in path)
+        path = path[:path.index(group[0]) + 1]
+        assert sectioned_list.dominator(group) == last_on_path(path, shared)
+
+        shared = set.intersection(*(post_dominators[node] for node in group))
+        path = next(paths_from(group[0]))
+        first = [node for node in path if node in shared]
+        assert sectioned_list.post_dominator(group) == (first[0] if first else None)
+
+
+def test_in_front_and_behind():
+    nodes = random_dag(random.Random(0), 12)
+    sectioned_list = get_sectioned_list(nodes[0])
+
+    for node in nodes:
+        index = sectioned_list.section_of[node]
+        assert in_front(node, sectioned_list) == sum(sectioned_list[index:], [])
+        assert behind(node, sectioned_list) == sum(sectioned_list[:index], [])
+
+
+def test_children_that_only_meet_at_the_exit():
+    head = Node("head")
+    a = Node("a")
+    head.add_connection(a)
+    for data in "bcd":
+        a.add_connection(Node(data))
+
+    sectioned_list = get_sectioned_list(head)
+    assert sectioned_list.immediate_post_dominator(a) is None
+    assert sectioned_list.post_dominator(a.children) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("(el) perro", "el perro/perro"),
+    ("(el) perro/gato", "el perro/el gato/perro/gato"),
+    ("(la) casa/hogar", "la casa/la hogar/casa/hogar"),
+    ("(un) a/b/c", "un a/un b/un c/a/b/c"),
+    ("perro/gato (m)", "perro m/gato m/perro/gato"),
+])
+def test_box_convert_optional_and_alternatives(text, expected):
+    program = compile_blueprint(QUIZ_BLUEPRINT)
+    struct = program.convert(text)
+    before = covert_to_struct(covert_to_json(struct))
+
+    boxes = box_convert(struct)
+
+    assert any(isinstance(part, tuple) for part in boxes)
+    assert equivalent(struct, before)
+    assert equivalent(struct, or_convert(expected))
@@ -0,0 +1,80 @@
+import random
+from itertools import takewhile
+
+import pytest
+
+from Structure import Node, accepted_strings, edit_distance
+from Structure.Constructor import add_option, or_convert
+
+
+def levenshtein(a: str, b: str) -> int:
+    row = list(range(len(b) + 1))
+    for i, a_char in enumerate(a, 1):
+        previous, row[0] = row[0], i
+        for j, b_char in enumerate(b, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (a_char != b_char))
+    return row[-1]
+
+
+def brute_force(struct_node: Node, text: str, max_distance: int) -> int | None:
+    # longer texts are further away than max_distance
+    candidates = takewhile(lambda accepted: len(accepted) <= len(text) + max_distance,
+                           accepted_strings(struct_node))
+    distance = min((levenshtein(text, accepted) for accepted in candidates), default=None)
+    return distance if distance is not None and distance <= max_distance else None
+
+
+def check(struct_node: Node, text: str, max_distance: int) -> None:
+    expected = brute_force(struct_node, text, max_distance)
+    found = edit_distance(struct_node, text, max_distance)
+    if expected is None:
+        assert found is None
+    else:
+        distance, nearest = found
+        assert distance == expected
+        assert levenshtein(text, nearest) == distance
+        assert nearest in set(takewhile(lambda accepted: len(accepted) <= len(nearest),
+                                        accepted_strings(struct_node)))
+
+
+def loop(text: str) -> Node:
+    """
+    accepts "text" repeated one or more times
+    """
+    head = or_convert(text)
+    first = next(iter(head.children))
+    tail = head.get_tail()
+    last = next(iter(tail.parents))
+    last.add_connection(first)
+    return head
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_against_brute_force(seed):
+    rng = random.Random(seed)
+    for _ in range(30):
+        words = ["".join(rng.choice("abc") for _ in range(rng.randint(0, 5))) for _ in range(3)]
+        head = or_convert("/".join(words))
+        if rng.random() < 0.5:
+            add_option(rng.choice("abc"), rng.choice(["", "d"]), head)
+
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 6)))
+        check(head, text, rng.randint(0, 3))
+
+
+@pytest.mark.parametrize("text", ["", "a", "ab", "abab", "aba", "ba", "abbab", "xyz"])
+def test_cyclic(text):
+    for max_distance in range(4):
+        check(loop("ab"), text, max_distance)
+
+
+def test_empty():
+    assert edit_distance(or_convert("abc"), "", 3) == (3, "abc")
+    assert edit_distance(or_convert("abc"), "", 2) is None
+    assert edit_distance(or_convert("/abc"), "", 0) == (0, "")
+    assert edit_distance(or_convert("/abc"), "ab", 1) == (1, "abc")
+
+
+def test_exact_match():
+    assert edit_distance(or_convert("hola/hello"), "hello", 0) == (0, "hello")
+    assert edit_distance(or_convert("hola/hello"), "holla", 1) == (1, "hola")
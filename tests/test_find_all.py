@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from Structure import Node, minimize
+from Structure.Constructor import find_all, or_convert
+
+from tests.test_edit_distance import loop
+
+
+def brute_force(find_str: str, head) -> set[tuple]:
+    """
+    every (node before, first char node, ..., last char node)
+    """
+    out = set()
+
+    def extend(path):
+        if len(path) == len(find_str) + 1:
+            out.add(tuple(path))
+            return
+        for child in path[-1].children:
+            if child.data == find_str[len(path) - 1]:
+                extend(path + [child])
+
+    for node in head.traverse():
+        extend([node])
+    return out
+
+
+def found(find_str: str, head) -> set[tuple]:
+    paths = find_all(find_str, head)
+    nodes = [tuple(path.nodes()) for path in paths]
+    assert len(nodes) == len(set(nodes))  # no path twice
+    return set(nodes)
+
+
+def test_repeated_labels():
+    head = or_convert("aaaa")
+    assert len(found("aa", head)) == 3
+    assert len(found("aaa", head)) == 2
+    assert found("aa", head) == brute_force("aa", head)
+
+
+def test_overlapping_paths():
+    # a/x share "b" and c/d are shared as well
+    head = minimize(or_convert("abc/abd/xbc/xbd"))
+    paths = find_all("bc", head)
+    assert found("bc", head) == brute_force("bc", head)
+    # the same "b" node, reached from "a" and from "x"
+    assert len({path[1] for path in paths}) == 1
+    assert {path[0].data for path in paths} == {"a", "x"}
+
+
+def test_paths_share_their_beginning():
+    head = or_convert("abc")
+    b = next(iter(next(iter(head.children)).children))
+    other_c = Node("c")
+    b.add_connection(other_c)
+    other_c.add_connection(head.get_tail())
+
+    paths = find_all("abc", head)
+    assert len(paths) == 2
+    assert paths[0].previous is paths[1].previous
+    assert {path.node for path in paths} == b.children
+
+
+def test_loops_and_missing_chars():
+    head = loop("ab")
+    assert found("aba", head) == brute_force("aba", head)
+    assert find_all("x", head) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_against_brute_force(seed):
+    rng = random.Random(seed)
+    for _ in range(30):
+        words = "/".join("".join(rng.choice("ab") for _ in range(rng.randint(1, 6))) for _ in range(3))
+        head = or_convert(words)
+        if rng.random() < 0.5:
+            head = minimize(head)
+        find_str = "".join(rng.choice("ab") for _ in range(rng.randint(1, 3)))
+        assert found(find_str, head) == brute_force(find_str, head)
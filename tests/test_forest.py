@@ -0,0 +1,54 @@
+import pytest
+
+from Structure import Forest, Node, equivalent
+from Structure.Blueprint import QUIZ_BLUEPRINT, compile_blueprint
+from Structure.Constructor import convert_linear_word, or_convert
+
+from Benchmarks.forest import book_words
+from tests.test_edit_distance import loop
+
+
+def test_round_trip_keeps_the_language():
+    program = compile_blueprint(QUIZ_BLUEPRINT)
+    words = book_words()[:300] + ["(el) perro/gato", "rojo, -a", "a/b; c (d)"]
+
+    forest = Forest()
+    structures = [program.convert(word) for word in words]
+    entries = [forest.add(struct) for struct in structures]
+
+    for struct, entry in zip(structures, entries):
+        assert equivalent(forest.structure(entry), struct)
+
+
+def test_shared_endings_are_stored_once():
+    forest = Forest()
+    first = forest.add(convert_linear_word("canción"))
+    size = len(forest)
+    second = forest.add(convert_linear_word("nación"))
+
+    # only "n", "a" and the head are new, "ción" + tail is shared
+    assert len(forest) - size == 3
+    assert forest.structure(first) is not forest.structure(second)
+    assert equivalent(forest.structure(second), convert_linear_word("nación"))
+
+
+def test_same_structure_is_the_same_entry_node():
+    forest = Forest()
+    first = forest.add(or_convert("ab/cd"))
+    size = len(forest)
+    second = forest.add(or_convert("cd/ab"))
+
+    assert len(forest) == size
+    assert forest.entries[first] == forest.entries[second]
+
+
+def test_invalid_structures():
+    forest = Forest()
+    with pytest.raises(TypeError):
+        forest.add(loop("ab"))
+
+    no_head = Node("a")
+    no_head.add_connection(Node("b"))
+    with pytest.raises(TypeError):
+        forest.add(no_head)
+    assert len(forest.entries) == 0
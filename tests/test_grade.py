@@ -0,0 +1,28 @@
+import json
+
+from Structure.Grade import grade, grade_word
+
+with open("Data/DataFiles/books/other/config.json") as config_file:
+    BOOK_CONFIG = json.load(config_file)
+
+
+def test_quiz_rules():
+    assert grade_word("(el) invierno", ["invierno", "el invierno", "verano"], BOOK_CONFIG) == \
+        [True, True, False]
+    assert grade_word("rojo, -a", ["rojo", "roja", "rojos"], BOOK_CONFIG) == [True, True, False]
+    assert grade_word("hej; tjena", ["hej", "tjena", "hej; tjena"], BOOK_CONFIG) == \
+        [True, True, False]
+
+
+def test_config_changes_grade():
+    attempts = [("hej; tjena", "tjena"), ("(el) invierno", "invierno")]
+
+    assert grade(attempts, BOOK_CONFIG) == [True, True]
+    assert grade(attempts, {**BOOK_CONFIG, "split_keys": []}) == [False, True]
+    assert grade(attempts, {**BOOK_CONFIG, "remove_between_keys": []}) == [True, False]
+
+
+def test_remove_keys():
+    assert grade_word("ung. tio", ["tio", "ung. tio"], BOOK_CONFIG) == [True, True]
+    assert grade_word("ung. tio", ["tio", "ung. tio"], {**BOOK_CONFIG, "remove_keys": []}) == \
+        [False, True]
@@ -0,0 +1,90 @@
+import json
+import random
+
+import pytest
+
+from Structure import Node, equivalent
+from Structure.Blueprint import QUIZ_BLUEPRINT, compile_blueprint
+from Structure.Constructor import add_option, or_convert
+from Structure.JsonConverter import covert_to_json, covert_to_struct
+
+from Benchmarks.forest import book_words
+
+
+def shuffled_copy(struct_node: Node, rng: random.Random) -> Node:
+    """
+    the same structure, with the nodes created and connected in
+    another order
+    """
+    nodes = list(struct_node.get_all())
+    order = list(range(len(nodes)))
+    rng.shuffle(order)
+    copies = {}
+    for i in order:
+        copies[nodes[i]] = Node(nodes[i].data)
+
+    edges = [(node, child) for node in nodes for child in node.children]
+    rng.shuffle(edges)
+    for node, child in edges:
+        copies[node].add_connection(copies[child])
+    return copies[rng.choice(nodes)]
+
+
+def random_structure(rng: random.Random) -> Node:
+    words = "/".join("".join(rng.choice("abc") for _ in range(rng.randint(1, 5))) for _ in range(4))
+    head = or_convert(words)
+    add_option(rng.choice("abc"), rng.choice(["", "x", "yz"]), head)
+    return head
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_shape_same_json(seed):
+    rng = random.Random(seed)
+    for _ in range(10):
+        struct = random_structure(rng)
+        json_str = covert_to_json(struct)
+        for _ in range(3):
+            assert covert_to_json(shuffled_copy(struct, rng)) == json_str
+
+
+def test_book_words_same_json():
+    rng = random.Random(0)
+    program = compile_blueprint(QUIZ_BLUEPRINT)
+    for word in book_words()[:300]:
+        struct = program.convert(word)
+        assert covert_to_json(shuffled_copy(struct, rng)) == covert_to_json(struct), word
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_round_trip(seed):
+    rng = random.Random(seed)
+    for _ in range(10):
+        struct = random_structure(rng)
+        json_str = covert_to_json(struct)
+        copy = covert_to_struct(json_str)
+
+        assert covert_to_json(copy) == json_str
+        assert copy.data == "head"
+        assert equivalent(copy, struct)
+
+
+def test_format():
+    json_str = covert_to_json(or_convert("ab"))
+    assert json_str == (
+        '[\n'
+        '{"data": "head", "parents": [], "children": [1]},\n'
+        '{"data": "a", "parents": [0], "children": [2]},\n'
+        '{"data": "b", "parents": [1], "children": [3]},\n'
+        '{"data": "tail", "parents": [2], "children": []}\n'
+        ']\n')
+    # topological, the ids only point forward
+    for i, node in enumerate(json.loads(covert_to_json(random_structure(random.Random(1))))):
+        assert all(child > i for child in node["children"])
+
+
+def test_different_shapes_differ():
+    assert covert_to_json(or_convert("ab/c")) != covert_to_json(or_convert("ab/d"))
+    assert covert_to_json(or_convert("ab")) != covert_to_json(or_convert("ba"))
+
+    with pytest.raises(TypeError):
+        covert_to_struct("[]")
@@ -0,0 +1,72 @@
+import random
+import string
+
+import pytest
+
+from Structure import accepted_strings, count_accepted
+from Structure.Blueprint import QUIZ_BLUEPRINT, compile_blueprint
+from Structure.Constructor import add_option, or_convert
+from tests.test_edit_distance import loop
+from tests.test_rewrite import expected_add_option
+
+
+def all_texts(words: list[str], find_str: str, with_str: str) -> set[str]:
+    """
+    brute force add_option(): every word with any amount of the
+    (non-overlapping) matches replaced
+    """
+    return set().union(*(expected_add_option(word, find_str, with_str) for word in words))
+
+
+def random_case(rng: random.Random):
+    words = ["".join(rng.choice("ab") for _ in range(rng.randint(0, 5))) for _ in range(rng.randint(1, 4))]
+    find_str = rng.choice("ab")
+    with_str = rng.choice(["", "c", "cc"])
+    head = or_convert("/".join(words))
+    add_option(find_str, with_str, head)
+    return head, all_texts(words, find_str, with_str)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_all_texts_shortest_first(seed):
+    rng = random.Random(seed)
+    for _ in range(20):
+        head, expected = random_case(rng)
+        texts = list(accepted_strings(head))
+        assert texts == sorted(expected, key=lambda text: (len(text), text))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_count_matches_brute_force(seed):
+    rng = random.Random(seed)
+    for _ in range(20):
+        head, expected = random_case(rng)
+        assert count_accepted(head) == len(expected)
+
+
+def test_limit():
+    head = or_convert("ccc/a/bb/ab")
+    assert list(accepted_strings(head, 2)) == ["a", "ab"]
+    assert list(accepted_strings(head, 0)) == []
+    assert list(accepted_strings(head, 10)) == ["a", "ab", "bb", "ccc"]
+
+
+def test_nothing_accepted():
+    head = or_convert("a")
+    head.remove_connection(next(iter(head.children)))
+    assert list(accepted_strings(head)) == []
+
+
+def test_infinite():
+    head = loop("ab")
+    assert list(accepted_strings(head, 3)) == ["ab", "abab", "ababab"]
+    with pytest.raises(TypeError):
+        count_accepted(head)
+
+
+def test_branching_count_without_expanding():
+    # every letter is optional, 2 ** 40 texts
+    letters = string.ascii_letters[:40]
+    head = compile_blueprint(QUIZ_BLUEPRINT).convert(" ".join(f"({letter})" for letter in letters) + " y")
+    assert count_accepted(head) == 2 ** 40
+    assert list(accepted_strings(head, 3)) == ["y", "A y", "B y"]
@@ -0,0 +1,79 @@
+import os
+import xml.etree.ElementTree as ElementTree
+
+from Structure import Node, freeze, layout, render, render_files, render_svg
+from Structure.Constructor import or_convert
+from Structure.JsonConverter import covert_to_json
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def no_tail() -> Node:
+    head = Node("head")
+    head.add_connection(Node("a"))
+    return head
+
+
+def chars(box) -> str:
+    if box.text is not None:
+        return box.text
+    return "".join(chars(child) for _, _, child in box.children)
+
+
+def test_layout_is_cached():
+    struct = or_convert("ab/c")
+    box = layout(struct)
+    assert layout(struct) is box
+
+    # same shape, other structure
+    assert layout(or_convert("ab/c")) is box
+    assert layout(freeze(or_convert("ab/c"))) is box
+    assert layout(or_convert("ab/d")) is not box
+
+
+def test_layout_keeps_the_structure():
+    struct = or_convert("ab/c")
+    json_str = covert_to_json(struct)
+    layout(struct)
+    assert covert_to_json(struct) == json_str
+
+
+def test_layout_boxes():
+    box = layout(or_convert("ab/c"))
+    assert sorted(chars(box)) == ["a", "b", "c"]
+    assert box.width > 0 and box.height > 0
+    for x, y, child in box.children:
+        assert 0 <= x and x + child.width <= box.width + 1e-9
+        assert 0 <= y and y + child.height <= box.height + 1e-9
+
+
+def test_render_passes_the_layout():
+    struct = or_convert("ab/c")
+    assert render(struct, lambda box, text_size: (box, text_size), 20) == (layout(struct), 20)
+
+
+def test_render_svg_parses():
+    svg = ElementTree.fromstring(render(or_convert("ab/c"), render_svg, 20))
+
+    assert svg.tag == SVG + "svg"
+    assert int(svg.get("width")) > 0 and int(svg.get("height")) > 0
+    assert sorted(text.text for text in svg.iter(SVG + "text")) == ["a", "b", "c"]
+    assert len(list(svg.iter(SVG + "rect"))) == 3
+    assert len(list(svg.iter(SVG + "path"))) == 1
+
+
+def test_render_files_reports_unsupported(tmp_path):
+    structures = {"ok": or_convert("ab/c"), "broken": no_tail(), "also_ok": or_convert("d")}
+    failed = render_files(structures, str(tmp_path / "out"), render_svg, ".svg", 20)
+
+    assert list(failed) == ["broken"]
+    assert isinstance(failed["broken"], TypeError)
+    assert sorted(os.listdir(tmp_path / "out")) == ["also_ok.svg", "ok.svg"]
+    for name in ("ok", "also_ok"):
+        ElementTree.parse(tmp_path / "out" / f"{name}.svg")
+
+
+def test_render_files_bytes(tmp_path):
+    failed = render_files({"a": or_convert("a")}, str(tmp_path), lambda box, text_size: b"\x00\x01", ".bin")
+    assert failed == {}
+    assert (tmp_path / "a.bin").read_bytes() == b"\x00\x01"
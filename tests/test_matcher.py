@@ -0,0 +1,76 @@
+import random
+
+from Structure import Matcher, compile_structure
+from Structure.Constructor import convert
+
+
+def matcher(text: str) -> Matcher:
+    return Matcher(compile_structure(convert(text, {})))
+
+
+def test_feed_and_backspace():
+    m = matcher("ab")
+    assert m.feed("a") == "prefix"
+    assert m.feed("x") == "diverged"
+    assert m.diverged_at == 1
+    assert m.backspace() == "prefix"
+    assert m.feed("b") == "complete"
+
+
+def test_backspace_on_empty_text():
+    m = matcher("ab")
+    assert m.backspace() == "prefix"
+    assert m.backspace() == "prefix"
+    assert m.states == [0]
+    assert m.feed("a") == "prefix"
+    assert m.feed("b") == "complete"
+
+
+def test_update():
+    m = matcher("hola")
+    assert m.update("hoxa") == "diverged"
+    assert m.update("hol") == "prefix"
+    assert m.update("hola") == "complete"
+    assert m.update("") == "prefix"
+
+
+def test_update_matches_from_scratch():
+    rng = random.Random(0)
+    automaton = compile_structure(convert("hola", {}))
+    m = Matcher(automaton)
+    text = ""
+    for _ in range(2000):
+        i = rng.randint(0, len(text))
+        if text and rng.random() < 0.4:
+            text = text[:i] + text[i + 1:]
+        else:
+            text = text[:i] + rng.choice("hola") + text[i:]
+        text = text[:8]
+
+        status = m.update(text)
+        fresh = Matcher(automaton)
+        for char in text:
+            fresh.feed(char)
+        assert (status, m.diverged_at, m.text) == (fresh.status, fresh.diverged_at, text)
+
+
+def test_update_only_rematches_the_tail():
+    automaton = compile_structure(convert("a" * 1000, {}))
+    looked_up = []
+
+    class Counting(type(automaton)):
+        __slots__ = ()
+
+        def state_transitions(self, state):
+            looked_up.append(state)
+            return super().state_transitions(state)
+
+    m = Matcher(Counting(automaton.transitions, automaton.accepting))
+    text = "a" * 999
+    assert m.update(text) == "prefix"
+
+    looked_up.clear()
+    assert m.update(text + "a") == "complete"
+    assert m.update(text) == "prefix"
+    assert m.update(text[:-1] + "ba") == "diverged"
+    assert looked_up == [999, 998]  # "a", then "b" (nothing after diverging)
@@ -0,0 +1,180 @@
+import importlib
+import random
+import time
+
+import pytest
+
+from Structure import Node, compile_structure, equivalent
+from Structure.Constructor import add_option, or_convert
+from Structure.JsonConverter import covert_to_json, covert_to_struct
+
+node_module = importlib.import_module("Structure.Node")
+
+
+@pytest.fixture(autouse=True)
+def structure_debug(monkeypatch):
+    # same as running with STRUCTURE_DEBUG=1
+    monkeypatch.setattr(node_module, "DEBUG", True)
+
+
+def check_registries(nodes: list[Node]) -> None:
+    for node in nodes:
+        scanned = set(node.traverse())
+        registry = node.registry
+        assert registry.members == scanned
+        assert registry.heads == {other for other in scanned if other.data == "head"}
+        assert registry.tails == {other for other in scanned if other.data == "tail"}
+
+        # the debug checks of get_all/get_head/get_tail
+        assert node.get_all() == scanned
+        for get in (node.get_head, node.get_tail):
+            try:
+                get()
+            except TypeError:
+                pass  # 0 or multiple heads/tails
+
+
+def mutate(rng: random.Random, nodes: list[Node]) -> None:
+    a, b = rng.sample(nodes, 2)
+    kind = rng.choice(["join", "join", "disconnect", "isolate", "data"])
+    if kind == "join":
+        a.add_connection(b)
+    elif kind == "disconnect" and a.children:
+        a.remove_connection(rng.choice(sorted(a.children, key=nodes.index)))
+    elif kind == "isolate":
+        a.remove()
+        a.children = set()
+        a.parents = set()
+    elif kind == "data":
+        a.data = rng.choice(["head", "tail", "point", "x"])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_registry_matches_traverse(seed):
+    rng = random.Random(seed)
+    nodes = [Node(rng.choice(["head", "tail", "a", "b"])) for _ in range(12)]
+    for _ in range(150):
+        mutate(rng, nodes)
+        check_registries(nodes)
+
+
+def chain(text: str) -> list[Node]:
+    nodes = [Node(char) for char in text]
+    for parent, child in zip(nodes, nodes[1:]):
+        parent.add_connection(child)
+    return nodes
+
+
+def test_traverse_yields_every_node_once():
+    nodes = chain("head abc tail")
+    nodes[2].add_connection(nodes[7])
+    nodes[7].add_connection(nodes[2])
+
+    traversed = list(nodes[5].traverse())
+    assert len(traversed) == len(set(traversed)) == len(nodes)
+
+
+def test_split_is_rebuilt_lazily():
+    nodes = chain("abcdef")
+    registry = nodes[0].registry
+
+    nodes[2].remove_connection(nodes[3])
+    assert registry.dirty  # nothing is rebuilt yet
+    nodes[4].remove_connection(nodes[5])
+
+    assert nodes[0].get_all() == set(nodes[:3])
+    assert nodes[3].get_all() == set(nodes[3:5])
+    assert nodes[5].get_all() == {nodes[5]}
+    assert not nodes[0].registry.dirty
+    check_registries(nodes)
+
+
+def test_removing_a_leaf_keeps_the_registry():
+    nodes = chain("abc")
+    registry = nodes[0].registry
+
+    nodes[2].remove()
+    assert nodes[0].registry is registry
+    assert not registry.dirty
+    assert registry.members == set(nodes[:2])
+
+
+def test_fixers_keep_the_registries():
+    rng = random.Random(0)
+    for _ in range(30):
+        words = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(3)]
+        heads = [or_convert(word) for word in words]
+        heads[0].merge(heads[1])
+        heads[0].merge(heads[2])
+        add_option("a", "", heads[0])
+        nodes = list(heads[0].traverse())
+
+        for fixer in (heads[0].head_tail_simplify, heads[0].make_head_tail,
+                      heads[0].point_simplify, heads[0].point_remove):
+            fixer()
+            # removed nodes keep their (one sided) connections
+            check_registries([node for node in nodes
+                              if all(node in child.parents for child in node.children) and
+                              all(node in parent.children for parent in node.parents)])
+
+
+def fan_out(parent_data: str, child_data: str) -> tuple[list[Node], list[Node]]:
+    parents = [Node(data) for data in parent_data]
+    children = [Node(data) for data in child_data]
+    for parent in parents:
+        for child in children:
+            parent.add_connection(child)
+    parents[0].make_head_tail()
+    return parents, children
+
+
+def test_point_simplify_groups_shared_parents():
+    parents, children = fan_out("ABC", "ab")
+    parents[0].point_simplify()
+
+    points = [node for node in parents[0].get_all() if node.data == "point"]
+    assert len(points) == 1
+    assert points[0].parents == set(parents)
+    assert points[0].children == set(children)
+
+
+@pytest.mark.parametrize("budget", [0, 100, 10_000])
+def test_point_simplify_keeps_the_language(budget):
+    rng = random.Random(budget)
+    for _ in range(20):
+        parents, children = fan_out("ABC", "abcdefgh")
+        for parent in parents:
+            for child in children:
+                if rng.random() < 0.3:
+                    parent.remove_connection(child)
+        parents[0].make_head_tail()
+        before = covert_to_struct(covert_to_json(parents[0]))
+
+        parents[0].point_simplify(budget=budget)
+        assert equivalent(parents[0], before)
+
+
+def test_point_simplify_budget_bounds_big_fan_outs():
+    parents, _ = fan_out("ABC", "abcdefghijklmnopqrstuvwxyz" * 80)
+    start = time.perf_counter()
+    parents[0].point_simplify(budget=1_000)
+    assert time.perf_counter() - start < 2
+
+
+def test_cache_is_cleared_on_change():
+    nodes = chain("abc")
+    for change in (lambda: nodes[1].add_connection(Node("d")),
+                   lambda: nodes[0].remove_connection(nodes[1]),
+                   lambda: setattr(nodes[2], "data", "e"),
+                   lambda: nodes[2].remove()):
+        nodes[1].cache["x"] = 1
+        change()
+        assert "x" not in nodes[1].cache
+
+
+def test_compiled_structure_follows_changes():
+    head = or_convert("ab")
+    assert compile_structure(head).check("ab")
+
+    add_option("b", "c", head)
+    assert compile_structure(head).check("ac")
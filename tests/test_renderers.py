@@ -0,0 +1,73 @@
+import re
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+from Structure import LayoutBox, layout, render_svg
+from Structure.Blueprint import QUIZ_BLUEPRINT, compile_blueprint
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def hand_made() -> LayoutBox:
+    """
+    "a" then "b" or "<", with a straight line and a curve
+    """
+    column = LayoutBox(2.2, 2.2)
+    column.children = [(0.8, 0, LayoutBox(0.6, 1, "b")), (0.8, 1.2, LayoutBox(0.6, 1, "<"))]
+    column.segments = [((0, 1.1), (0.8, 0.5)),
+                       ((0, 1.1), (0.4, 1.1), (0.4, 1.7), (0.8, 1.7)),
+                       ((1.4, 0.5), (1.4, 0.5))]  # zero length
+
+    row = LayoutBox(3.6, 2.2)
+    row.children = [(0, 0.6, LayoutBox(0.6, 1, "a")), (1.4, 0, column)]
+    row.segments = [((0.6, 1.1), (1.4, 1.1))]
+    return row
+
+
+def test_svg_golden():
+    assert render_svg(hand_made(), 10) == "\n".join([
+        '<svg xmlns="http://www.w3.org/2000/svg" width="36" height="22" viewBox="0 0 36 22">',
+        '<g fill="rgb(255,100,255)">',
+        '<rect x="0" y="6" width="6" height="10"/>',
+        '<rect x="22" y="0" width="6" height="10"/>',
+        '<rect x="22" y="12" width="6" height="10"/>',
+        '</g>',
+        '<path fill="none" stroke="rgb(0,0,0)" d="M 6 11 L 14 11 M 14 11 L 22 5 M 14 11 C 18 11 18 17 22 17"/>',
+        '<g fill="rgb(0,0,0)" font-family="Arial, Helvetica, sans-serif" font-size="10" '
+        'text-anchor="middle" dominant-baseline="central">',
+        '<text x="3" y="11" xml:space="preserve">a</text>',
+        '<text x="25" y="5" xml:space="preserve">b</text>',
+        '<text x="25" y="17" xml:space="preserve">&lt;</text>',
+        '</g>',
+        '</svg>',
+        ""])
+
+
+@pytest.mark.parametrize("text", ["el <perro>/&gato", "(el) perro/gato", "rojo, -a", "a"])
+def test_svg_has_no_zero_length_lines(text):
+    box = layout(compile_blueprint(QUIZ_BLUEPRINT).convert(text))
+    svg = ElementTree.fromstring(render_svg(box, 20))
+
+    path = svg.find(SVG + "path").get("d")
+    for segment in re.findall(r"M [^M]+", path):
+        numbers = re.findall(r"-?[\d.]+", segment)
+        assert numbers[:2] != numbers[-2:], segment
+
+
+def test_png_smoke():
+    pytest.importorskip("PIL")
+    from io import BytesIO
+
+    from PIL import Image
+
+    from Structure.RasterRenderer import render_image, render_png
+
+    image = render_image(hand_made(), 10)
+    assert image.size == (36, 22)
+    assert image.getpixel((0, 6)) == (255, 100, 255, 255)  # corner of "a"
+    assert image.getpixel((35, 0))[3] == 0  # transparent
+
+    png = render_png(hand_made(), 10)
+    assert png.startswith(b"\x89PNG")
+    assert Image.open(BytesIO(png)).size == (36, 22)
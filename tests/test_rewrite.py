@@ -0,0 +1,104 @@
+"""
+Checks rewrite() (through replace()/add_option()) against the same
+thing done on the accepted strings (see the rewrite() docstring).
+"""
+import random
+from itertools import combinations
+
+import pytest
+
+from Structure import accepted_strings
+from Structure.Constructor import add_option, or_convert, replace
+
+
+def occurrences(text: str, find_str: str) -> list[int]:
+    return [i for i in range(len(text) - len(find_str) + 1) if text.startswith(find_str, i)]
+
+
+def non_overlapping(text: str, find_str: str):
+    found = occurrences(text, find_str)
+    for amount in range(len(found) + 1):
+        for picked in combinations(found, amount):
+            if all(b - a >= len(find_str) for a, b in zip(picked, picked[1:])):
+                yield picked
+
+
+def rewritten(text: str, find_str: str, with_str: str, picked) -> str:
+    out = []
+    position = 0
+    for i in picked:
+        out += [text[position:i], with_str]
+        position = i + len(find_str)
+    return "".join(out) + text[position:]
+
+
+def expected_add_option(text: str, find_str: str, with_str: str) -> set[str]:
+    return {rewritten(text, find_str, with_str, picked)
+            for picked in non_overlapping(text, find_str)}
+
+
+def expected_replace(text: str, find_str: str, with_str: str) -> set[str]:
+    found = occurrences(text, find_str)
+    return {rewritten(text, find_str, with_str, picked)
+            for picked in non_overlapping(text, find_str)
+            if all(any(abs(i - j) < len(find_str) for j in picked) for i in found)}
+
+
+def random_text(rng: random.Random, chars: str, low: int, high: int) -> str:
+    return "".join(rng.choice(chars) for _ in range(rng.randint(low, high)))
+
+
+def test_overlapping_examples():
+    head = or_convert("aaa")
+    replace("aa", "x", head)
+    assert set(accepted_strings(head)) == {"xa", "ax"}
+
+    head = or_convert("aabbb")
+    replace("bb", "yx", head)
+    assert set(accepted_strings(head)) == {"aayxb", "aabyx"}
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_single_rewrite(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        words = {random_text(rng, "ab", 1, 7) for _ in range(rng.randint(1, 4))}
+        find_str = random_text(rng, "ab", 1, 3)
+        with_str = random_text(rng, "xy", 0, 2)
+
+        head = or_convert("/".join(sorted(words)))
+        replace(find_str, with_str, head)
+        assert set(accepted_strings(head)) == \
+            set().union(*(expected_replace(word, find_str, with_str) for word in words))
+
+        # same as str.replace() when the matches can't overlap
+        if not any(find_str.startswith(find_str[i:]) for i in range(1, len(find_str))):
+            assert set(accepted_strings(head)) == \
+                {word.replace(find_str, with_str) for word in words}
+
+        head = or_convert("/".join(sorted(words)))
+        add_option(find_str, with_str, head)
+        assert set(accepted_strings(head)) == \
+            set().union(*(expected_add_option(word, find_str, with_str) for word in words))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_chained_rewrites(seed):
+    # no empty replacements, their points aren't matched by later rewrites
+    rng = random.Random(seed)
+    for _ in range(300):
+        words = {random_text(rng, "ab", 1, 7) for _ in range(rng.randint(1, 4))}
+        head = or_convert("/".join(sorted(words)))
+
+        for _ in range(3):
+            find_str = random_text(rng, "abxy", 1, 3)
+            with_str = random_text(rng, "abxy", 1, 2)
+            if rng.random() < 0.5:
+                replace(find_str, with_str, head)
+                expected = expected_replace
+            else:
+                add_option(find_str, with_str, head)
+                expected = expected_add_option
+            words = set().union(*(expected(word, find_str, with_str) for word in words))
+
+        assert set(accepted_strings(head)) == words
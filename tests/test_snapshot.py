@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from Structure import Node, Snapshot, accepted_strings, compile_structure, snapshot
+from Structure.Blueprint import QUIZ_BLUEPRINT, compile_blueprint
+from Structure.Constructor import convert_linear_word
+from Structure.Snapshot import EPSILON_DATA
+
+from Benchmarks.forest import book_words
+from tests.test_edit_distance import loop
+from tests.test_json_converter import random_structure
+
+
+def skipping(node: Node, visited: frozenset[Node] = frozenset()):
+    """
+    (brute force) every node reachable from node through epsilon nodes only,
+    and if one of those paths ends at the tail
+    """
+    reached = set()
+    ends = node.data == "tail" and not node.children
+    for child in node.children:
+        if child in visited:
+            continue
+        reached.add(child)
+        if child.data in EPSILON_DATA:
+            sub_reached, sub_ends = skipping(child, visited | {node})
+            reached |= sub_reached
+            ends = ends or sub_ends
+    return reached, ends
+
+
+def structures() -> list[Node]:
+    program = compile_blueprint(QUIZ_BLUEPRINT)
+    rng = random.Random(0)
+    return [program.convert(word) for word in book_words()[:100]] + \
+        [random_structure(rng) for _ in range(30)] + \
+        [loop("ab/c"), loop("(a)b"), convert_linear_word("")]
+
+
+@pytest.mark.parametrize("struct", structures())
+def test_closure_matches_traverse(struct):
+    snap = Snapshot(struct)
+    nodes = list(struct.traverse())
+    assert snap.nodes == tuple(nodes)
+    ids = {node: i for i, node in enumerate(nodes)}
+
+    for i, node in enumerate(nodes):
+        reached, ends = skipping(node)
+        closure = {}
+        for other in reached:
+            if other.data not in EPSILON_DATA and len(other.data) == 1:
+                closure.setdefault(other.data, set()).add(ids[other])
+
+        assert {char: set(successors) for char, successors in snap.closures[i].items()} == closure
+        assert (i in snap.ends) == ends
+
+    assert snap.start == {ids[node] for node in nodes if node.data == "head" and not node.parents}
+
+
+@pytest.mark.parametrize("struct", structures()[::7])
+def test_check_matches_automaton(struct):
+    snap = snapshot(struct)
+    assert snapshot(struct) is snap
+    check = compile_structure(struct).check
+
+    rng = random.Random(0)
+    texts = list(accepted_strings(struct, 20))
+    for text in texts:
+        assert snap.check(text)
+    for text in texts:
+        for _ in range(5):
+            chars = list(text)
+            position = rng.randint(0, len(chars))
+            chars[position:position + rng.randint(0, 1)] = rng.choice(["", "a", "x"])
+            changed = "".join(chars)
+            assert snap.check(changed) == check(changed)